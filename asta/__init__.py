@@ -4,5 +4,6 @@
 from asta import warning
 from asta.array import Array
 from asta.scalar import Scalar
+from asta.config import enable, disable, is_enabled
 from asta.decorators import typechecked
 from asta.switchboard import Tensor, TFTensor
@@ -25,7 +25,7 @@ class _ArrayMeta(SubscriptableMeta):
 
     @classmethod
     @abstractmethod
-    def _after_subscription(cls, item: Any) -> None:
+    def _parse_subscription(cls, item: Any) -> Dict[str, Any]:
         """ Method signature for subscript argument processing. """
         raise NotImplementedError
 
@@ -36,7 +36,7 @@ class _ArrayMeta(SubscriptableMeta):
         raise NotImplementedError
 
     def __getitem__(cls, item: Any) -> GenericMeta:
-        """ Defer to superclass, which calls ``cls._after_subscription()``. """
+        """ Defer to superclass, which calls ``cls._parse_subscription()``. """
         return SubscriptableMeta.__getitem__(cls, item)
 
     def __eq__(cls, other: Any) -> bool:
@@ -120,12 +120,9 @@ class _Array(metaclass=_ArrayMeta):
         return dtype, kind
 
     @classmethod
-    def _after_subscription(
+    def _parse_subscription(
         cls, item: Union[type, Optional[Union[int, EllipsisType]]]  # type: ignore
-    ) -> None:
-        """ Set class attributes based on the passed dtype/dim data. """
+    ) -> Dict[str, Any]:
+        """ Compute class attributes based on the passed dtype/dim data. """
         dtype, shape, kwattrs, kind = parse_subscript(cls, item, np.dtype)
-        cls.dtype = dtype
-        cls.shape = shape
-        cls.kwattrs = kwattrs
-        cls.kind = kind
+        return {"dtype": dtype, "shape": shape, "kwattrs": kwattrs, "kind": kind}
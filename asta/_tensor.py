@@ -24,12 +24,12 @@ class _TensorMeta(SubscriptableMeta):
 
     @classmethod
     @abstractmethod
-    def _after_subscription(cls, item: Any) -> None:
+    def _parse_subscription(cls, item: Any) -> Dict[str, Any]:
         """ Method signature for subscript argument processing. """
         raise NotImplementedError
 
     def __getitem__(cls, item: Any) -> GenericMeta:
-        """ Defer to the metaclass which calls ``cls._after_subscription()``. """
+        """ Defer to the metaclass which calls ``cls._parse_subscription()``. """
         return SubscriptableMeta.__getitem__(cls, item)
 
     def __eq__(cls, other: Any) -> bool:
@@ -109,11 +109,9 @@ class _Tensor(metaclass=_TensorMeta):
         return dtype, None
 
     @classmethod
-    def _after_subscription(
+    def _parse_subscription(
         cls, item: Union[type, Optional[Union[int, EllipsisType]]]  # type: ignore
-    ) -> None:
-        """ Set class attributes based on the passed dtype/dim data. """
+    ) -> Dict[str, Any]:
+        """ Compute class attributes based on the passed dtype/dim data. """
         dtype, shape, kwattrs, _ = parse_subscript(cls, item, torch.dtype)
-        cls.dtype = dtype
-        cls.shape = shape
-        cls.kwattrs = kwattrs
+        return {"dtype": dtype, "shape": shape, "kwattrs": kwattrs}
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Lazy detection and wiring of the optional torch and tensorflow backends. A
+backend is only imported when one of its asta types is subscripted, or when it
+has already been imported by someone else, since otherwise no object can be an
+instance of one of its types.
+"""
+import sys
+import importlib
+from typing import Any, Dict, NamedTuple
+
+# pylint: disable=import-outside-toplevel
+
+
+class Backend(NamedTuple):
+    """ Where to find the asta wrapper for a backend, and how to display it. """
+
+    wrapper: str
+    class_name: str
+    shape_type_name: str
+    prefix: str
+
+
+BACKENDS: Dict[str, Backend] = {
+    "torch": Backend("asta.tensor", "Tensor", "Size", "torch"),
+    "tensorflow": Backend("asta.tftensor", "TFTensor", "TensorShape", "tf"),
+}
+
+# Maps names of wired backends to their asta subscriptable classes.
+WIRED: Dict[str, Any] = {}
+
+
+def wire(name: str) -> Any:
+    """
+    Import the backend ``name`` and its asta wrapper module, register the
+    backend's array and dimension types, and return the asta class. Raises an
+    ``ImportError`` if the backend is not installed.
+    """
+    if name in WIRED:
+        return WIRED[name]
+
+    from asta.constants import ARRAY_TYPES, ALL_DIM_TYPES
+
+    backend = BACKENDS[name]
+    module = importlib.import_module(name)
+    wrapper = importlib.import_module(backend.wrapper)
+    ARRAY_TYPES.append(module.Tensor)
+    ALL_DIM_TYPES.append(getattr(module, backend.shape_type_name))
+    WIRED[name] = getattr(wrapper, backend.class_name)
+    return WIRED[name]
+
+
+def get_wired() -> Dict[str, Any]:
+    """ Wire all backends which have been imported elsewhere, and return them. """
+    if len(WIRED) < len(BACKENDS):
+        for name in BACKENDS:
+            if name not in WIRED and name in sys.modules:
+                wire(name)
+    return WIRED
+
+
+def get_array_type(name: str) -> type:
+    """ Return the native tensor type of the wired backend ``name``. """
+    tensor_type: type = sys.modules[name].Tensor
+    return tensor_type
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Memoization of passed checks, keyed on the types, dtypes and shapes of the
+arguments. A signature only exists for annotations whose checks are fully
+determined by these (and by the values of ``asta.dims`` and ``asta.shapes``),
+so a cache hit can safely skip the whole check.
+"""
+import collections
+from typing import Any, Dict, List, Tuple, Union, Hashable, Callable, Optional
+
+import asta.dims
+import asta.shapes
+from asta.classes import SubscriptableMeta
+
+Signer = Callable[[Any], Hashable]
+
+# pylint: disable=too-many-return-statements
+
+
+def leaf_signature(value: Any) -> Hashable:
+    """ The type of ``value``, along with its dtype and shape if it has them. """
+    value_type: type = type(value)
+    if hasattr(value, "shape") and hasattr(value, "dtype"):
+        return value_type, value.dtype, tuple(value.shape)
+    return value_type
+
+
+def compile_signer(annotation: Any) -> Optional[Signer]:
+    """
+    Return a function computing the signature of values checked against
+    ``annotation``, or ``None`` if the outcome of the check may depend on more
+    than the types, dtypes and shapes of the value and its elements.
+    """
+    if isinstance(annotation, SubscriptableMeta):
+        # Arbitrary attributes are checked by ``kwattrs``.
+        return None if annotation.kwattrs else leaf_signature
+
+    origin = getattr(annotation, "__origin__", None)
+    args: Tuple[Any, ...] = getattr(annotation, "__args__", None) or ()
+    if origin is None:
+        # Named tuples and typed dicts have per-field checks.
+        if hasattr(annotation, "_fields") or hasattr(annotation, "__total__"):
+            return None
+        return leaf_signature
+
+    if origin is Union:
+        signers = [compile_signer(arg) for arg in args]
+        if all(signer is leaf_signature for signer in signers):
+            return leaf_signature
+        return None
+
+    if origin in (list, tuple, collections.abc.Sequence) and not args:
+        return leaf_signature
+
+    if origin in (list, collections.abc.Sequence) or (
+        origin is tuple and len(args) == 2 and args[1] is Ellipsis
+    ):
+        element_signer = compile_signer(args[0])
+        if element_signer is None:
+            return None
+        return sequence_signer(element_signer)
+
+    if origin is tuple:
+        if args == ((),):
+            return leaf_signature
+        signers = [compile_signer(arg) for arg in args]
+        if any(signer is None for signer in signers):
+            return None
+        return tuple_signer(signers)  # type: ignore[arg-type]
+
+    if origin is dict and len(args) == 2:
+        key_signer = compile_signer(args[0])
+        value_signer = compile_signer(args[1])
+        if key_signer is None or value_signer is None:
+            return None
+        return dict_signer(key_signer, value_signer)
+
+    return None
+
+
+def sequence_signer(element_signer: Signer) -> Signer:
+    """ Signatures for homogeneous sequences. """
+
+    def _signer(value: Any) -> Hashable:
+        return type(value), tuple(element_signer(elem) for elem in value)
+
+    return _signer
+
+
+def tuple_signer(signers: List[Signer]) -> Signer:
+    """ Signatures for fixed-length heterogeneous tuples. """
+
+    def _signer(value: Any) -> Hashable:
+        elems = tuple(signer(elem) for signer, elem in zip(signers, value))
+        return type(value), len(value), elems
+
+    return _signer
+
+
+def dict_signer(key_signer: Signer, value_signer: Signer) -> Signer:
+    """ Signatures for dictionaries. """
+
+    def _signer(value: Any) -> Hashable:
+        items = tuple((key_signer(k), value_signer(v)) for k, v in value.items())
+        return type(value), items
+
+    return _signer
+
+
+def signature(signers: Tuple[Signer, ...], values: List[Any]) -> Optional[Tuple]:
+    """
+    Compute the signature of a call, or ``None`` if it has none. The
+    generations of ``asta.dims`` and ``asta.shapes`` and the dims bound by
+    ``dims.scope()`` are included, so that signatures are invalidated whenever
+    a dim or shape changes.
+    """
+    try:
+        sigs = tuple(signer(value) for signer, value in zip(signers, values))
+        scope_key = asta.dims.scope_var.get().key
+        key = (asta.dims.generation, asta.shapes.generation, scope_key, sigs)
+        hash(key)
+    except (TypeError, AttributeError):
+        return None
+    return key
+
+
+class SignatureCache:
+    """
+    A bounded mapping with least-recently-used eviction. Safe to share between
+    threads, in that concurrent evictions at worst make ``get()`` miss.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.entries: Dict[Hashable, Any] = collections.OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        """ Return the entry for ``key``, or ``None`` if there is none. """
+        entry = self.entries.get(key)
+        if entry is not None:
+            # Another thread may have evicted it in the meantime.
+            try:
+                self.entries.move_to_end(key)  # type: ignore[attr-defined]
+            except KeyError:
+                pass
+        return entry
+
+    def put(self, key: Hashable, entry: Any) -> None:
+        """ Record ``entry``, evicting the least recently used if we're full. """
+        self.entries[key] = entry
+        try:
+            self.entries.move_to_end(key)  # type: ignore[attr-defined]
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)  # type: ignore[call-arg]
+        except KeyError:
+            pass
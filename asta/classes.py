@@ -2,13 +2,16 @@
 # -*- coding: utf-8 -*-
 """ Supermetaclasses for ``_Array``-like asta types. """
 import types
+import weakref
 from abc import abstractmethod
 from typing import Any, Dict, List, Tuple, Generic, TypeVar, Optional
 
 import numpy as np
 from oxentiel import Oxentiel
+from sympy.core.expr import Expr
 
 from asta.utils import shape_repr
+from asta.solver import compile_dimension
 from asta.config import get_ox
 from asta.scalar import Scalar
 from asta.constants import Printable
@@ -17,6 +20,9 @@ from asta.constants import Printable
 
 T = TypeVar("T")
 
+# Canonical subscripted classes, keyed by origin class and parsed attributes.
+SUBSCRIPTIONS: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
 
 class GenericMeta(type, Generic[T]):
     """ Abstract base metaclass for subscriptable types. """
@@ -28,7 +34,7 @@ class GenericMeta(type, Generic[T]):
 
     @classmethod
     @abstractmethod
-    def _after_subscription(cls, item: Any) -> None:
+    def _parse_subscription(cls, item: Any) -> Dict[str, Any]:
         """ Method signature for subscript argument processing. """
         raise NotImplementedError
 
@@ -66,7 +72,7 @@ class SubscriptableMeta(GenericMeta):
 
     @classmethod
     @abstractmethod
-    def _after_subscription(cls, item: Any) -> None:
+    def _parse_subscription(cls, item: Any) -> Dict[str, Any]:
         """ Method signature for subscript argument processing. """
         raise NotImplementedError
 
@@ -77,23 +83,37 @@ class SubscriptableMeta(GenericMeta):
         raise NotImplementedError
 
     def __getitem__(cls, item: Any) -> GenericMeta:
+        # Verify it is not a staticmethod.
+        if isinstance(cls._parse_subscription, types.FunctionType):
+            name = "_parse_subscription"
+            static_err = f"The '{name}' method should not be static."
+            raise TypeError(static_err)
+
+        # Return the existing class if an identical one has been created.
+        attrs = cls._parse_subscription(item)
+        key = subscription_key(cls, attrs)
+        if key is not None:
+            existing: Optional[GenericMeta] = SUBSCRIPTIONS.get(key)
+            if existing is not None:
+                return existing
+
         body = {
             **cls.__dict__,
+            **attrs,
+            "_hash": 0,
             "__args__": item,
             "__origin__": cls,
         }
         bases = cls, *cls.__bases__
         result: GenericMeta = type(cls.__name__, bases, body)  # type: ignore
 
-        if hasattr(result, "_after_subscription"):
-
-            # Verify it is not a staticmethod.
-            if isinstance(result._after_subscription, types.FunctionType):
-                name = "_after_subscription"
-                static_err = f"The '{name}' method should not be static."
-                raise TypeError(static_err)
+        # Compile dimension expressions like ``X + 1`` once, up front.
+        for elem in getattr(result, "shape", None) or ():
+            if isinstance(elem, Expr):
+                compile_dimension(elem)
 
-            result._after_subscription(item)
+        if key is not None:
+            SUBSCRIPTIONS[key] = result
         return result
 
     def __eq__(cls, other: Any) -> bool:
@@ -117,24 +137,7 @@ class SubscriptableMeta(GenericMeta):
         assert hasattr(cls, "shape")
         assert hasattr(cls, "dtype")
         assert hasattr(cls, "kwattrs")
-        subscript: List[Any] = []
-        if cls.dtype is not None:
-            if cls.NAME == "Array":
-                printable_dtype = Printable(f"np.{cls.dtype.name}")
-                subscript.append(printable_dtype)
-            else:
-                subscript.append(cls.dtype)
-        if cls.shape is not None:
-            shape = tuple(cls.shape)
-            printable_shape = Printable(f"shape={shape_repr(shape)}")
-            subscript.append(printable_shape)
-        if cls.kwattrs is not None:
-            printable_kwattrs = Printable(f"attrs={cls.kwattrs}")
-            subscript.append(printable_kwattrs)
-
-        rep = f"<asta.{cls.NAME}{subscript}>"
-
-        return rep
+        return subscription_repr(cls.NAME, cls.dtype, cls.shape, cls.kwattrs)
 
     @staticmethod
     def get_shape(item: Tuple) -> Optional[Tuple]:
@@ -156,3 +159,55 @@ class SubscriptableMeta(GenericMeta):
             shape = shape[0]
 
         return shape
+
+
+def subscription_repr(
+    name: str,
+    dtype: Any,
+    shape: Optional[Tuple],
+    kwattrs: Optional[Dict[str, Any]],
+    prefix: str = "asta",
+) -> str:
+    """
+    String representation of the class ``name`` subscripted with the given
+    attributes, e.g. ``<asta.Array[np.float64, shape=(8, 64)]>``. Used to
+    describe values without creating a subscripted class for them.
+    """
+    subscript: List[Any] = []
+    if dtype is not None:
+        if name == "Array":
+            printable_dtype = Printable(f"np.{dtype.name}")
+            subscript.append(printable_dtype)
+        else:
+            subscript.append(dtype)
+    if shape is not None:
+        shape = tuple(shape)
+        printable_shape = Printable(f"shape={shape_repr(shape)}")
+        subscript.append(printable_shape)
+    if kwattrs is not None:
+        printable_kwattrs = Printable(f"attrs={kwattrs}")
+        subscript.append(printable_kwattrs)
+
+    return f"<{prefix}.{name}{subscript}>"
+
+
+def subscription_key(cls: type, attrs: Dict[str, Any]) -> Optional[Tuple]:
+    """
+    Compute a hashable key identifying the class ``cls[item]``, where ``attrs``
+    are the parsed attributes of ``item``. Returns ``None`` if some attribute
+    is unhashable, in which case the class is not interned.
+    """
+    values: List[Any] = [cls]
+    for attr, value in sorted(attrs.items()):
+        if isinstance(value, tuple):
+            # Avoid conflating e.g. ``1`` and ``sympy.Integer(1)``.
+            value = tuple((type(elem), elem) for elem in value)
+        elif isinstance(value, dict):
+            value = tuple(sorted(value.items()))
+        values.append((attr, value))
+    key = tuple(values)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
@@ -116,6 +116,43 @@ def as_dict(config: configparser.ConfigParser) -> Dict[str, Dict[str, str]]:
     return dictionary
 
 
+def parse_value(val: Any) -> Any:
+    """ Convert ``yes``/``no`` to booleans, leaving other values as they are. """
+    if isinstance(val, str) and val in ("yes", "no"):
+        return val == "yes"
+    return val
+
+
+def parse_number(val: Any, numeric_type: type) -> Any:
+    """
+    Convert the value of a numeric option to ``numeric_type`` if it's a string
+    of that type, like ``"128"`` for ``int``. Anything else is returned as is,
+    for the option's user to validate.
+    """
+    if isinstance(val, str):
+        try:
+            return numeric_type(val)
+        except ValueError:
+            pass
+    return val
+
+
+class Switch:
+    """
+    The process-wide typechecking switch. Decorated functions read ``on`` on
+    every call, so it's kept on a slotted object rather than the config,
+    where attribute lookups are several times slower.
+    """
+
+    __slots__ = ("on",)
+
+    def __init__(self) -> None:
+        self.on = True
+
+
+SWITCH = Switch()
+
+
 def get_ox() -> Oxentiel:
     """ Returns a configuration file. """
     ox = _internal.ox
@@ -148,13 +185,33 @@ def get_ox() -> Oxentiel:
 
         new_settings = collections.OrderedDict()
         for key, val in settings.items():
-            new_val: Any = val
-            if val in ("yes", "no"):
-                # pylint: disable=simplifiable-if-expression
-                new_val = True if val == "yes" else False
-            new_settings[key.replace("-", "_")] = new_val
+            new_settings[key.replace("-", "_")] = parse_value(val)
         settings = new_settings
 
         ox = Oxentiel(settings, mutable=True)
+
+        # Typechecking is only on if both the config and environment agree.
+        if "ASTA_TYPECHECK" in os.environ:
+            ox.on = ox.on and os.environ["ASTA_TYPECHECK"] == "1"
+        SWITCH.on = ox.on
+
         _internal.ox = ox
     return ox
+
+
+def enable() -> None:
+    """ Turn on typechecking, including for functions already decorated. """
+    get_ox().on = True
+    SWITCH.on = True
+
+
+def disable() -> None:
+    """ Turn off typechecking, including for functions already decorated. """
+    get_ox().on = False
+    SWITCH.on = False
+
+
+def is_enabled() -> bool:
+    """ Return whether or not typechecking is currently on. """
+    get_ox()
+    return SWITCH.on
@@ -2,30 +2,15 @@
 # -*- coding: utf-8 -*-
 """ Constants and helper classes for asta types. """
 import datetime
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Callable
 
 import numpy as np
 from sympy.core.expr import Expr
 from sympy.core.symbol import Symbol
 
+from asta.backends import get_wired
 from asta.placeholder import Placeholder
 
-_TORCH_IMPORTED = False
-try:
-    import torch
-
-    _TORCH_IMPORTED = True
-except ImportError:
-    pass
-_TENSORFLOW_IMPORTED = False
-try:
-    import tensorflow as tf
-
-    _TENSORFLOW_IMPORTED = True
-except ImportError:
-    pass
-
-
 # pylint: disable=invalid-name, too-few-public-methods
 
 # Python built-in magic attribute names.
@@ -120,6 +105,8 @@ class ScalarMeta(type):
 
     def __instancecheck__(cls, inst: Any) -> bool:
         """ Support expected behavior for ``isinstance(<number-like>, Scalar)``. """
+        # Make sure the array types of any imported backends are registered.
+        get_wired()
         for arr_type in cls._ARRAY_TYPES:
             if isinstance(inst, arr_type):
                 assert hasattr(inst, "shape")
@@ -158,14 +145,11 @@ class Color:
     END = "\033[0m"
 
 
-if not _TORCH_IMPORTED:
-    torch = TorchModule()
-if not _TENSORFLOW_IMPORTED:
-    tf = TFModule()
-
 # Types.
-GenericArray = Union[np.ndarray, torch.Tensor, tf.Tensor]
-ARRAY_TYPES: List[type] = [np.ndarray, torch.Tensor, tf.Tensor]
+GenericArray = Any  # One of ``np.ndarray``, ``torch.Tensor``, or ``tf.Tensor``.
+
+# Array and dimension types of wired backends are appended by ``asta.backends``.
+ARRAY_TYPES: List[type] = [np.ndarray]
 GENERIC_TYPES: List[type] = [
     bool,
     int,
@@ -191,49 +175,94 @@ CORE_DIM_TYPES: List[type] = [
     Symbol,
 ]
 NUMPY_DIM_TYPES: List[type] = CORE_DIM_TYPES
-TORCH_DIM_TYPES: List[type] = CORE_DIM_TYPES + [torch.Size]
-TF_DIM_TYPES: List[type] = CORE_DIM_TYPES + [tf.TensorShape]
-ALL_DIM_TYPES: List[type] = CORE_DIM_TYPES + [torch.Size, tf.TensorShape]
+ALL_DIM_TYPES: List[type] = list(CORE_DIM_TYPES)
 NP_UNSIZED_TYPE_KINDS: Dict[type, str] = {bytes: "S", str: "U", object: "O"}
-TORCH_DTYPE_MAP: Dict[type, torch.dtype] = {
-    int: torch.int32,
-    float: torch.float32,
-    bool: torch.bool,
-    bytes: torch.uint8,
-}
-TF_DTYPE_MAP: Dict[type, tf.dtypes.DType] = {
-    int: tf.int32,
-    float: tf.float32,
-    complex: tf.complex128,
-    bool: tf.bool,
-    bytes: tf.string,
-    str: tf.string,
+
+
+def _torch_constants() -> Dict[str, Any]:
+    """ Import torch and compute the constants which depend on it. """
+    try:
+        import torch  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        torch = TorchModule()
+
+    return {
+        "torch": torch,
+        "TORCH_DIM_TYPES": CORE_DIM_TYPES + [torch.Size],
+        "TORCH_DTYPE_MAP": {
+            int: torch.int32,
+            float: torch.float32,
+            bool: torch.bool,
+            bytes: torch.uint8,
+        },
+    }
+
+
+def _tf_constants() -> Dict[str, Any]:
+    """ Import tensorflow and compute the constants which depend on it. """
+    try:
+        import tensorflow as tf  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        tf = TFModule()
+
+    return {
+        "tf": tf,
+        "TF_DIM_TYPES": CORE_DIM_TYPES + [tf.TensorShape],
+        "TF_DTYPE_MAP": {
+            int: tf.int32,
+            float: tf.float32,
+            complex: tf.complex128,
+            bool: tf.bool,
+            bytes: tf.string,
+            str: tf.string,
+        },
+        "TF_DTYPES": [
+            tf.bfloat16,
+            tf.bool,
+            tf.complex,
+            tf.complex128,
+            tf.complex64,
+            tf.double,
+            tf.float16,
+            tf.float32,
+            tf.float64,
+            tf.half,
+            tf.int16,
+            tf.int32,
+            tf.int64,
+            tf.int8,
+            tf.qint16,
+            tf.qint32,
+            tf.qint8,
+            tf.quint16,
+            tf.quint8,
+            tf.resource,
+            tf.string,
+            tf.uint16,
+            tf.uint32,
+            tf.uint64,
+            tf.uint8,
+            tf.variant,
+        ],
+    }
+
+
+# Constants which import a backend, computed the first time they are accessed.
+LAZY_CONSTANTS: Dict[str, Callable[[], Dict[str, Any]]] = {
+    "torch": _torch_constants,
+    "TORCH_DIM_TYPES": _torch_constants,
+    "TORCH_DTYPE_MAP": _torch_constants,
+    "tf": _tf_constants,
+    "TF_DIM_TYPES": _tf_constants,
+    "TF_DTYPE_MAP": _tf_constants,
+    "TF_DTYPES": _tf_constants,
 }
-TF_DTYPES = [
-    tf.bfloat16,
-    tf.bool,
-    tf.complex,
-    tf.complex128,
-    tf.complex64,
-    tf.double,
-    tf.float16,
-    tf.float32,
-    tf.float64,
-    tf.half,
-    tf.int16,
-    tf.int32,
-    tf.int64,
-    tf.int8,
-    tf.qint16,
-    tf.qint32,
-    tf.qint8,
-    tf.quint16,
-    tf.quint8,
-    tf.resource,
-    tf.string,
-    tf.uint16,
-    tf.uint32,
-    tf.uint64,
-    tf.uint8,
-    tf.variant,
-]
+
+
+def __getattr__(name: str) -> Any:
+    """ Compute backend-dependent constants on demand, and cache them. """
+    if name not in LAZY_CONSTANTS:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    constants = LAZY_CONSTANTS[name]()
+    globals().update(constants)
+    return constants[name]
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+The store of dimension equations gathered while checking a single call. It is
+threaded through every checker and only ever grows, except when a ``Union``
+member which failed is rolled back.
+"""
+from typing import Set, Dict, List, Tuple, Iterable, Optional, NamedTuple
+
+from sympy.core.expr import Expr
+from sympy.core.symbol import Symbol
+
+from asta.utils import AFFINE, SYMBOLIC, Fragment
+from asta.solver import Partial, divide, reduce, complete, linear_form
+
+
+class Conflict(NamedTuple):
+    """
+    A symbol which some equation binds to a different value than before, along
+    with the name of the argument which bound it first, if it is known.
+    """
+
+    symbol: Symbol
+    bound: int
+    value: int
+    origin: Optional[str]
+
+
+Mark = Tuple[int, int, Optional[Conflict]]
+
+
+class Constraints(set):
+    """
+    A set of equations which must all equal zero, along with the values of the
+    symbols which some equation determines on its own, like ``X - 32``, and the
+    names of the arguments which bound them. Adding an equation which binds a
+    symbol to a different value is reported as a conflict right away, rather
+    than when the whole system is solved.
+
+    Parameters
+    ----------
+    equations : ``Iterable[Expr]``.
+        Initial equations, e.g. those from the arguments of a call.
+    """
+
+    __slots__ = ("bindings", "origins", "log", "bound", "conflict", "solved")
+
+    def __init__(self, equations: Iterable[Expr] = ()) -> None:
+        super().__init__()
+        self.bindings: Dict[Symbol, int] = {}
+        self.origins: Dict[Symbol, str] = {}
+        self.log: List[Expr] = []
+        self.bound: List[Symbol] = []
+        self.conflict: Optional[Conflict] = None
+        self.solved: Optional[Tuple[int, Partial]] = None
+        self.extend(equations)
+
+    def extend(
+        self, equations: Iterable[Expr], name: Optional[str] = None
+    ) -> Optional[Conflict]:
+        """
+        Add ``equations`` from the argument ``name``, returning the first
+        conflict with an earlier binding, if any. Conflicting equations are
+        added regardless, so that the system is still reported as unsolvable if
+        the conflict doesn't raise.
+        """
+        first: Optional[Conflict] = None
+        for equation in equations:
+            if equation in self:
+                continue
+            self.add(equation)
+            self.log.append(equation)
+            conflict = self.bind(equation, name)
+            if conflict is not None and first is None:
+                first = conflict
+        if first is not None and self.conflict is None:
+            self.conflict = first
+        return first
+
+    def bind(self, equation: Expr, name: Optional[str] = None) -> Optional[Conflict]:
+        """ Record the binding made by ``equation``, if it makes one. """
+        if isinstance(equation, int):
+            return None
+        form = linear_form(equation)
+        if form is None or len(form[0]) != 1:
+            return None
+        (symbol, coefficient), = form[0].items()
+        value = divide(-form[1], coefficient)
+
+        # Non-integer sizes are left for the solver to reject.
+        if value.denominator != 1:
+            return None
+        bound = self.bindings.get(symbol)
+        if bound is None:
+            self.bindings[symbol] = int(value)
+            self.bound.append(symbol)
+            if name is not None:
+                self.origins[symbol] = name
+            return None
+        if bound != value:
+            return Conflict(symbol, bound, int(value), self.origins.get(symbol))
+        return None
+
+    def determines(self, fragment: Fragment, inst_shape: Tuple[int, ...]) -> bool:
+        """
+        Whether every symbolic element of ``fragment`` is a linear expression
+        whose symbols are already bound, and which evaluates to the
+        corresponding dimension of ``inst_shape``, so that matching it would
+        add nothing. Only integer arithmetic is done.
+        """
+        bindings = self.bindings
+        for (kind, elem), dim in zip(fragment, inst_shape):
+            if kind == SYMBOLIC:
+                return False
+            if kind == AFFINE and elem.evaluate(bindings) != dim:
+                return False
+        return True
+
+    def mark(self) -> Mark:
+        """ Return a mark which ``rollback()`` can return to. """
+        return len(self.log), len(self.bound), self.conflict
+
+    def rollback(self, mark: Mark) -> None:
+        """ Discard everything added since ``mark()`` returned ``mark``. """
+        num_equations, num_bound, self.conflict = mark
+        for equation in self.log[num_equations:]:
+            self.discard(equation)
+        for symbol in self.bound[num_bound:]:
+            del self.bindings[symbol]
+            self.origins.pop(symbol, None)
+        del self.log[num_equations:]
+        del self.bound[num_bound:]
+        if self.solved is not None and self.solved[0] > num_equations:
+            self.solved = None
+
+    def solve(self) -> Tuple[bool, Set[Symbol], List[Dict[Symbol, int]]]:
+        """
+        Solve the equations for positive size free symbols, like
+        ``astasolver()``. Only the equations added since the last solution are
+        solved, with the symbols it bound substituted, so the return value of a
+        call doesn't re-solve the equations from its arguments. Solutions which
+        needed sympy aren't reused.
+        """
+        if not self:
+            return True, set(), []
+        start, partial = self.solved if self.solved is not None else (0, None)
+        consistent, partial, nonlinear = reduce(self.log[start:], partial)
+        if consistent and not nonlinear:
+            self.solved = (len(self.log), partial)
+        return complete(consistent, partial, nonlinear)
+
+    def copy(self) -> "Constraints":
+        """ Return a copy which can grow independently of this one. """
+        copy = Constraints()
+        copy.update(self)
+        copy.bindings.update(self.bindings)
+        copy.origins.update(self.origins)
+        copy.log.extend(self.log)
+        copy.bound.extend(self.bound)
+        copy.conflict = self.conflict
+        copy.solved = self.solved
+        return copy
+
+
+def as_constraints(equations: Set[Expr]) -> Constraints:
+    """ Return ``equations`` as a ``Constraints``, without copying if it is one. """
+    if isinstance(equations, Constraints):
+        return equations
+    return Constraints(equations)
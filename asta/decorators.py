@@ -3,68 +3,22 @@
 """ Defines the ``@typechecked`` decorator. """
 import os
 import inspect
-from typing import Any, Set, Dict, Tuple
+import functools
+from typing import Any, Set, Dict, List, Tuple, Optional
 
 from oxentiel import Oxentiel
-from sympy.core.expr import Expr
 
-from asta.utils import astasolver
-from asta.config import get_ox
-from asta.display import get_header, fail_system, handle_pass
-from asta.origins import check_annotation
+from asta.plan import CheckPlan, compile_plan
+from asta.cache import signature
+from asta.config import SWITCH, get_ox, parse_number
+from asta.display import CURRENT_HEADER, fail_system, handle_pass
+from asta.sampling import SequenceSampler, parse_sequence_sampling
+from asta.constraints import Constraints
 
 
-def validate_annotations(  # type: ignore[no-untyped-def]
-    decorated, annotations: Dict[str, Any], args: Tuple[Any], kwargs: Dict[str, Any],
-) -> Dict[str, Any]:
-    """
-    Make sure there is an annotation for each parameter, return arguments in
-    args other than class references (self, cls, mcs), and keyword arguments in
-    kwargs with defaults filled in.
-    """
-    num_annots = len(annotations)
-    num_non_return_annots = num_annots
-    if "return" in annotations:
-        num_non_return_annots -= 1
-
-    # Get the parameter list from the function signature.
-    sig = inspect.signature(decorated)
-    paramlist = list(sig.parameters)
-
-    # Get a list of kwargs with defaults filled-in.
-    defaults: Dict[str, Any] = {}
-    for k, v in sig.parameters.items():
-        if v.default is not inspect.Parameter.empty:
-            defaults[k] = v.default
-
-    checkable_args: Dict[str, Any] = defaults.copy()
-    checkable_args.update(kwargs)
-
-    # Remove unannotated instance/class/metaclass reference.
-    pure_args = args
-    refs = ("self", "cls", "mcs")
-
-    if len(sig.parameters) == num_non_return_annots + 1 and paramlist[0] in refs:
-        pure_args = pure_args[1:]  # type: ignore[assignment]
-    for i, arg in enumerate(pure_args):
-        name = list(annotations.keys())[i]
-        checkable_args[name] = arg
-
-    # Check for mismatch between lengths of arguments/annotations.
-    if num_non_return_annots != len(checkable_args):
-        num_annot_err = f"Mismatch between number of annotated "
-        num_annot_err += f"non-(self / cls / mcs) parameters "
-        num_annot_err += f"'({num_non_return_annots})' and number of arguments "
-        num_annot_err += f"'({len(checkable_args)})'. "
-        num_annot_err += f"Possible causes: wrong number of arguments, or missing"
-        num_annot_err += f"type hint."
-
-        raise TypeError(num_annot_err)
-
-    return checkable_args
-
-
-def typechecked(decorated):  # type: ignore[no-untyped-def]
+def typechecked(  # type: ignore[no-untyped-def]
+    decorated=None, *, sequence_sampling: Optional[Dict[str, str]] = None
+):
     """
     Typecheck a function annotated with ``asta`` type objects. This decorator
     will only check the shape and datatype of parameters annotated with
@@ -76,21 +30,36 @@ def typechecked(decorated):  # type: ignore[no-untyped-def]
     ----------
     decorated : ``Callable[[Any], Any]``.
         The function to be typechecked.
+    sequence_sampling : ``Optional[Dict[str, str]]``.
+        Maps parameter names (or ``return``) to strategies, like ``random:16``,
+        which override the ``sequence-sampling`` option when checking the
+        elements of containers passed as those parameters. Use it as
+        ``@typechecked(sequence_sampling={...})``.
 
     Returns
     -------
-    _wrapper : ``Callable[[Any], Any]``.
-        The decorated version of ``decorated``.
+    wrapper : ``Callable[[Any], Any]``.
+        The decorated version of ``decorated``. If ``decorated`` is a coroutine
+        function, so is ``wrapper``, and it checks the awaited result.
     """
+    if decorated is None:
+        return functools.partial(typechecked, sequence_sampling=sequence_sampling)
+
     ox: Oxentiel = get_ox()
-    if "ASTA_TYPECHECK" in os.environ:
-        ox.on = ox.on and os.environ["ASTA_TYPECHECK"] == "1"
-    if not ox.on:
+
+    # Setting ``ASTA_TYPECHECK`` to anything but "1" still leaves functions
+    # decorated afterwards unwrapped, so that they cost nothing even if
+    # typechecking is turned back on with ``enable()``.
+    if os.environ.get("ASTA_TYPECHECK", "1") != "1":
         return decorated
 
     # Treat classes.
     if inspect.isclass(decorated):
 
+        # Names are checked once against all methods, and each method only gets
+        # the overrides for its own parameters.
+        check_sampled_names(decorated, sequence_sampling)
+
         # Grab the module name.
         prefix = decorated.__qualname__ + "."
 
@@ -109,66 +78,215 @@ def typechecked(decorated):  # type: ignore[no-untyped-def]
                 ):
 
                     # Decorate the method/function/class.
-                    setattr(decorated, key, typechecked(attr))
+                    sampling = sampling_for(attr, sequence_sampling)
+                    checked = typechecked(attr, sequence_sampling=sampling)
+                    setattr(decorated, key, checked)
 
             # Only for class and staticmethods; instance methods are caught above.
             elif isinstance(attr, (classmethod, staticmethod)):
 
                 # If the underlying function has annotations.
                 if getattr(attr.__func__, "__annotations__", None):
-                    wrapped = typechecked(attr.__func__)
+                    sampling = sampling_for(attr.__func__, sequence_sampling)
+                    wrapped = typechecked(attr.__func__, sequence_sampling=sampling)
 
                     # Re-wrap with ``classmethod`` or ``staticmethod`` and put back.
                     setattr(decorated, key, type(attr)(wrapped))
 
         return decorated
 
+    # Parse sequence sampling overrides now, so that mistakes surface early.
+    check_sampled_names(decorated, sequence_sampling)
+    samplers: Dict[str, SequenceSampler] = {}
+    seed = parse_number(ox.sequence_sample_seed, int)
+    for name, spec in (sequence_sampling or {}).items():
+        samplers[name] = parse_sequence_sampling(spec, seed)
+
+    # Compute everything which doesn't depend on the arguments exactly once,
+    # deferring it to the first checked call if typechecking is off for now.
+    plan: Optional[CheckPlan] = None
+    if SWITCH.on:
+        plan = compile_plan(decorated, ox, samplers)
+
+    def _sampled_plan() -> Optional[CheckPlan]:
+        """ Return the plan if this call should be checked, else ``None``. """
+        nonlocal plan
+        if plan is None:
+            plan = compile_plan(decorated, ox, samplers)
+
+        # Skip calls which aren't sampled.
+        if plan.sampler is not None and not plan.sampler.sample():
+            return None
+        return plan
+
     def _wrapper(*args: Tuple[Any], **kwargs: Dict[str, Any]) -> Any:
         """ Decorated/typechecked function. """
+        # Keep this first, so that it's all we pay when typechecking is off.
+        if not SWITCH.on:
+            return decorated(*args, **kwargs)
+        call_plan = _sampled_plan()
+        if call_plan is None:
+            return decorated(*args, **kwargs)
+
+        equations, key = check_arguments(call_plan, args, kwargs, ox)
+        ret = decorated(*args, **kwargs)
+        return check_return(call_plan, ret, equations, key, ox)
+
+    async def _async_wrapper(*args: Tuple[Any], **kwargs: Dict[str, Any]) -> Any:
+        """ Decorated/typechecked coroutine function. """
+        if not SWITCH.on:
+            return await decorated(*args, **kwargs)
+        call_plan = _sampled_plan()
+        if call_plan is None:
+            return await decorated(*args, **kwargs)
 
+        # Arguments are checked before awaiting, and the result after.
+        equations, key = check_arguments(call_plan, args, kwargs, ox)
+        ret = await decorated(*args, **kwargs)
+        return check_return(call_plan, ret, equations, key, ox)
+
+    wrapper = _async_wrapper if inspect.iscoroutinefunction(decorated) else _wrapper
+    wrapper.__module__ = decorated.__module__
+    wrapper.__name__ = decorated.__name__
+    wrapper.__wrapped__ = decorated  # type: ignore[union-attr]
+
+    return wrapper
+
+
+def annotated_names(decorated: Any) -> Set[str]:
+    """
+    The names annotated by ``decorated``, or, for a class, by any of the
+    methods and nested classes which ``@typechecked`` would decorate.
+    """
+    if not inspect.isclass(decorated):
+        return set(getattr(decorated, "__annotations__", {}))
+
+    names: Set[str] = set()
+    prefix = decorated.__qualname__ + "."
+    for attr in decorated.__dict__.values():
+        if isinstance(attr, (classmethod, staticmethod)):
+            names.update(getattr(attr.__func__, "__annotations__", {}))
+        elif (
+            inspect.isfunction(attr)
+            or inspect.ismethod(attr)
+            or inspect.isclass(attr)
+        ):
+            if attr.__qualname__.startswith(prefix):
+                names.update(annotated_names(attr))
+    return names
+
+
+def check_sampled_names(
+    decorated: Any, sequence_sampling: Optional[Dict[str, str]]
+) -> None:
+    """ Raise if ``sequence_sampling`` names parameters ``decorated`` lacks. """
+    names = annotated_names(decorated)
+    for name in sequence_sampling or {}:
+        if name != "return" and name not in names:
+            raise ValueError(
+                f"Can't sample sequence parameter '{name}' of "
+                f"'{decorated.__qualname__}', which isn't annotated."
+            )
+
+
+def sampling_for(
+    decorated: Any, sequence_sampling: Optional[Dict[str, str]]
+) -> Optional[Dict[str, str]]:
+    """ The overrides in ``sequence_sampling`` which apply to ``decorated``. """
+    if sequence_sampling is None:
+        return None
+    names = annotated_names(decorated)
+    return {
+        name: spec
+        for name, spec in sequence_sampling.items()
+        if name == "return" or name in names
+    }
+
+
+def check_arguments(
+    plan: CheckPlan, args: Tuple[Any, ...], kwargs: Dict[str, Any], ox: Oxentiel
+) -> Tuple[Constraints, Optional[Tuple]]:
+    """
+    Check the arguments of a call. Returns the resulting equations, and the
+    signature of the call if it is cached, for use by ``check_return()``.
+    """
+    token = CURRENT_HEADER.set(plan.header)
+    try:
         # Print header for ``decorated``.
-        ox.decorated = decorated
-        header: str = get_header(decorated)
-        handle_pass(header, ox)
-
-        equations: Set[Expr] = set()
-        annotations: Dict[str, Any] = decorated.__annotations__
-        checkable_args: Dict[str, Any] = validate_annotations(
-            decorated,
-            annotations,
-            args,  # type: ignore
-            kwargs,
-        )
+        handle_pass(plan.header, ox)
+
+        equations = Constraints()
+        values: List[Any] = plan.bind(args, kwargs)
+
+        # Look up the signature of this call among those which passed before.
+        # Failures are only guaranteed to stop a call if they raise, and passes
+        # are only printed if they're checked.
+        key: Optional[Tuple] = None
+        if plan.cache is not None and ox.raise_errors and not ox.print_passes:
+            key = signature(plan.signers, values)  # type: ignore[arg-type]
+        cached = plan.cache.get(key) if key is not None else None  # type: ignore
+
+        if cached is not None:
+            return Constraints(cached), key
 
         # Check arguments.
-        for name, arg in checkable_args.items():
-            annotation = annotations[name]
-            equations = check_annotation(name, arg, annotation, equations, ox)
-            del annotation
+        for checker, value in zip(plan.checkers, values):
+            equations = checker(value, equations)
 
         # Solve our system of equations if it is nonempty.
-        solvable, symbols, solutions = astasolver(equations)
-        if not solvable:
+        solvable, symbols, solutions = equations.solve()
+        # Conflicting bindings have been reported already.
+        if not solvable and equations.conflict is None:
             fail_system(equations, symbols, solutions, ox)
+        if key is not None:
+            plan.cache.put(key, frozenset(equations))  # type: ignore
+    finally:
+        CURRENT_HEADER.reset(token)
 
-        # Call the decorated function.
-        ret = decorated(*args, **kwargs)
+    return equations, key
 
+
+def check_return(
+    plan: CheckPlan,
+    ret: Any,
+    equations: Constraints,
+    key: Optional[Tuple],
+    ox: Oxentiel,
+) -> Any:
+    """
+    Check the return value of a call whose arguments gave ``equations``, and
+    return it, wrapped in a checking proxy if it is an annotated iterator.
+    """
+    # The return value is memoized along with the arguments it came from.
+    return_key: Optional[Tuple] = None
+    if key is not None:
+        if plan.return_signer is None:
+            if plan.return_checker is None:
+                return ret
+        else:
+            return_key = signature((plan.return_signer,), [ret])
+            if return_key is not None:
+                return_key = (key, return_key)
+                if plan.cache.get(return_key) is not None:  # type: ignore
+                    return ret
+
+    token = CURRENT_HEADER.set(plan.header)
+    try:
         # Check return.
-        ox.decorated = decorated
-        if "return" in annotations:
-            annotation = annotations["return"]
-            equations = check_annotation("return", ret, annotation, equations, ox)
-            del annotation
+        if plan.return_checker is not None:
+            equations = plan.return_checker(ret, equations)
 
         # Solve our system of equations if it is nonempty.
-        solvable, symbols, solutions = astasolver(equations)
-        if not solvable:
+        solvable, symbols, solutions = equations.solve()
+        # Conflicting bindings have been reported already.
+        if not solvable and equations.conflict is None:
             fail_system(equations, symbols, solutions, ox)
-
-        return ret
-
-    _wrapper.__module__ = decorated.__module__
-    _wrapper.__name__ = decorated.__name__
-
-    return _wrapper
+        if return_key is not None:
+            plan.cache.put(return_key, True)  # type: ignore
+    finally:
+        CURRENT_HEADER.reset(token)
+
+    # Items of returned iterators are checked as they are produced.
+    if plan.return_wrapper is not None:
+        return plan.return_wrapper(ret, equations)
+    return ret
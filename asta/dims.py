@@ -2,7 +2,19 @@
 # -*- coding: utf-8 -*-
 """ A module for programmatically storing dimension sizes for annotations. """
 import sys
-from typing import Any, Dict, Union, Optional
+import inspect
+import functools
+import contextvars
+from typing import (
+    Any,
+    Dict,
+    Tuple,
+    Union,
+    Callable,
+    Optional,
+    FrozenSet,
+    NamedTuple,
+)
 
 from sympy import symbols
 from sympy.core.symbol import Symbol
@@ -22,6 +34,84 @@ def __getattr__(name: str) -> Any:
     raise NotImplementedError
 
 
+class Scope(NamedTuple):
+    """
+    Dim values bound by ``dims.scope()`` for the current context.
+
+    Attributes
+    ----------
+    values : ``Dict[Symbol, int]``.
+        The bound values, including those of enclosing scopes.
+    key : ``FrozenSet[Tuple[Symbol, int]]``.
+        A hashable version of ``values``, for use in cache keys.
+    """
+
+    values: Dict[Symbol, int]
+    key: FrozenSet[Tuple[Symbol, int]]
+
+
+EMPTY_SCOPE = Scope({}, frozenset())
+
+# The tokens of the scopes entered in the current context, innermost last, so
+# that a single ``ScopeBinding`` can be entered by several contexts at once.
+SCOPE_TOKENS: contextvars.ContextVar[
+    Tuple[Tuple["ScopeBinding", contextvars.Token], ...]
+] = contextvars.ContextVar("asta_dims_scope_tokens", default=())
+
+
+class ScopeBinding:
+    """
+    Binds dim values while it's entered, as returned by ``dims.scope()``. As a
+    decorator, it binds them around each call of the decorated function, or
+    around the whole of each call of a coroutine function, awaits included.
+
+    Parameters
+    ----------
+    scope_var : ``contextvars.ContextVar``.
+        The variable holding the ``Scope`` of the current context.
+    values : ``Dict[str, int]``.
+        The dim values to bind, keyed by name.
+    """
+
+    def __init__(self, scope_var: contextvars.ContextVar, values: Dict[str, int]):
+        for value in values.values():
+            if not isinstance(value, int):
+                raise TypeError("Value of a dim must be an integer.")
+        self.scope_var = scope_var
+        self.values = values
+
+    def __enter__(self) -> None:
+        outer: Scope = self.scope_var.get()
+        bound = {**outer.values, **{symbols(k): v for k, v in self.values.items()}}
+        token = self.scope_var.set(Scope(bound, frozenset(bound.items())))
+        SCOPE_TOKENS.set(SCOPE_TOKENS.get() + ((self, token),))
+
+    def __exit__(self, *exc_info: Any) -> None:
+        # Blocks exit in the reverse order they're entered within a context.
+        tokens = SCOPE_TOKENS.get()
+        binding, token = tokens[-1]
+        assert binding is self
+        SCOPE_TOKENS.set(tokens[:-1])
+        self.scope_var.reset(token)
+
+    def __call__(self, func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def _async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self:
+                    return await func(*args, **kwargs)
+
+            return _async_wrapper
+
+        @functools.wraps(func)
+        def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self:
+                return func(*args, **kwargs)
+
+        return _wrapper
+
+
 class Dimensions:
     """ An instance of this object acts as a proxy for this module. """
 
@@ -29,6 +119,14 @@ class Dimensions:
         # Set any attributes here - before initialisation (they remain normal attrs).
         self.symbol_map: Dict[Symbol, Optional[int]] = {}
 
+        # Incremented whenever the value of a dim changes.
+        self.generation = 0
+
+        # Values bound by ``self.scope()``, which take precedence over ``symbol_map``.
+        self.scope_var: contextvars.ContextVar = contextvars.ContextVar(
+            "asta_dims_scope", default=EMPTY_SCOPE
+        )
+
         # After initialization, setting attributes is the same as setting an item.
         self.__initialized = True
 
@@ -47,6 +145,9 @@ class Dimensions:
 
         # Handle everything else as a symbol.
         symbol = symbols(name)
+        scoped_value: Optional[int] = self.scope_var.get().values.get(symbol)
+        if scoped_value is not None:
+            return scoped_value
         if symbol not in self.symbol_map:
             self.symbol_map[symbol] = None
             return symbol
@@ -66,7 +167,21 @@ class Dimensions:
             if not isinstance(value, int):
                 raise TypeError("Value of a dim must be an integer.")
             symbol = symbols(name)
-            self.symbol_map[symbol] = value
+            if self.symbol_map.get(symbol) != value:
+                self.symbol_map[symbol] = value
+                super().__setattr__("generation", self.generation + 1)
+
+    def scope(self, **values: int) -> ScopeBinding:
+        """
+        Bind dim values for the current thread or asyncio task only, until the
+        block exits. Scopes nest, and inner values override outer ones. Also
+        works as a decorator, including of ``async def`` functions.
+
+        >>> with dims.scope(BATCH=32):
+        ...     dims.BATCH
+        32
+        """
+        return ScopeBinding(self.scope_var, values)
 
 
 sys.modules[__name__] = Dimensions()  # type: ignore[assignment]
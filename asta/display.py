@@ -1,21 +1,27 @@
 """ Functions for generating typechecker output. """
 import inspect
-from typing import Any, Set, Dict, List, Union, FrozenSet
+import contextvars
+from typing import Any, Set, Dict, List, Union, Optional, FrozenSet
 
 import numpy as np
 from oxentiel import Oxentiel
 from sympy.core.expr import Expr
 from sympy.core.symbol import Symbol
 
-from asta.array import Array
-from asta.classes import SubscriptableMeta
-from asta.constants import _TORCH_IMPORTED, _TENSORFLOW_IMPORTED, Color, tf, torch
+from asta.classes import SubscriptableMeta, subscription_repr
+from asta.backends import BACKENDS, get_wired, get_array_type
+from asta.constants import Color
 
-if _TORCH_IMPORTED:
-    from asta.tensor import Tensor
+# The header of the function being checked in the current thread or task.
+CURRENT_HEADER: contextvars.ContextVar = contextvars.ContextVar(
+    "asta_current_header", default=""
+)
 
-if _TENSORFLOW_IMPORTED:
-    from asta.tftensor import TFTensor
+# Whether we're trying the members of a ``Union``, in which case failures are
+# only raised for ``check_union()`` to catch, and never printed.
+PROBING: contextvars.ContextVar = contextvars.ContextVar(
+    "asta_probing", default=False
+)
 
 FAIL = f"{Color.RED}FAILED{Color.END}"
 PASS = f"{Color.GREEN}PASSED{Color.END}"
@@ -46,32 +52,35 @@ def qualified_name(obj: Any) -> str:
 
 def type_representation(arg: Any) -> str:
     """ Get a string representation of an argument including dtype and shape. """
-    rep = repr(type(arg))
-    if hasattr(arg, "shape"):
-        shape = arg.shape
-    if hasattr(arg, "dtype"):
-        dtype = arg.dtype
     if isinstance(arg, np.ndarray):
-        astatype = Array[dtype, shape]  # type: ignore[valid-type, type-arg]
-        rep = repr(astatype).replace("asta", "numpy")
-    elif isinstance(arg, torch.Tensor):
-        astatype = Tensor[dtype, shape]  # type: ignore
-        rep = repr(astatype).replace("asta", "torch")
-    elif isinstance(arg, tf.Tensor):
-        astatype = TFTensor[dtype, shape]  # type: ignore
-        rep = repr(astatype).replace("asta", "tf")
-    return rep
-
-
-def pass_argument(name: str, ann: SubscriptableMeta, rep: str, ox: Oxentiel) -> None:
+        return subscription_repr("Array", arg.dtype, arg.shape, None, "numpy")
+
+    # Only backends which have been imported can have created ``arg``.
+    for name in get_wired():
+        array_type: Any = get_array_type(name)
+        if isinstance(arg, array_type):
+            backend = BACKENDS[name]
+            return subscription_repr(
+                backend.class_name, arg.dtype, arg.shape, None, backend.prefix
+            )
+    return repr(type(arg))
+
+
+def pass_argument(name: str, ann: SubscriptableMeta, arg: Any, ox: Oxentiel) -> None:
     """ Print typecheck pass notification for arguments. """
+    if not ox.print_passes:
+        return
+    rep = type_representation(arg)
     msg = f"{PASS}: Argument '{name}' matched parameter '{ann}' "
     msg += f"with actual type: '{rep}'"
     handle_pass(msg, ox)
 
 
-def pass_return(name: str, ann: SubscriptableMeta, rep: str, ox: Oxentiel) -> None:
+def pass_return(name: str, ann: SubscriptableMeta, arg: Any, ox: Oxentiel) -> None:
     """ Print typecheck pass notification for return values. """
+    if not ox.print_passes:
+        return
+    rep = type_representation(arg)
     msg = f"{PASS}: Return {name} matched return type '{ann}' with actual type: '{rep}'"
     handle_pass(msg, ox)
 
@@ -147,6 +156,13 @@ def fail_sequence(name: str, ann: Any, rep: str, ox: Oxentiel) -> None:
     handle_error(err, ox)
 
 
+def fail_iterable(name: str, kind: str, ann: Any, rep: str, ox: Oxentiel) -> None:
+    """ Print/raise error when an iterable or iterator fails isinstance check. """
+    err = f"{FAIL}: Argument '{name}' must be {kind}. Expected type: '{ann}' "
+    err += f"Actual type: '{rep}'"
+    handle_error(err, ox)
+
+
 def fail_dict(name: str, ann: Any, rep: str, ox: Oxentiel) -> None:
     """ Print/raise error when ``Dict[*]`` fails isinstance check. """
     err = f"{FAIL}: Argument '{name}' must be a dictionary. Expected type: '{ann}' "
@@ -281,6 +297,23 @@ def fail_system(
     handle_error(err, ox)
 
 
+def fail_conflict(
+    name: str,
+    symbol: Symbol,
+    bound: int,
+    value: int,
+    origin: Optional[str],
+    ox: Oxentiel,
+) -> None:
+    """ Print/raise error when an argument binds a symbol to a second value. """
+    err = f"{FAIL}: Argument '{name}' binds '{symbol}' to {value}, "
+    if origin is None:
+        err += f"but it is already bound to {bound}"
+    else:
+        err += f"but '{origin}' already bound it to {bound}"
+    handle_error(err, ox)
+
+
 def fail_fallback(name: str, annrep: str, rep: str, ox: Oxentiel) -> None:
     """ Print/raise error when arbitrary value fails isinstance check. """
     err = f"{FAIL}: Argument '{name}' is not an instance of: '{annrep}' "
@@ -290,8 +323,10 @@ def fail_fallback(name: str, annrep: str, rep: str, ox: Oxentiel) -> None:
 
 def handle_error(err: str, ox: Oxentiel) -> None:
     """ Either print or raise ``err``. """
-    if not ox.print_passes and hasattr(ox, "decorated"):
-        header = get_header(ox.decorated)
+    if PROBING.get():
+        raise TypeError(err)
+    header = CURRENT_HEADER.get()
+    if not ox.print_passes and header:
         print(header)
     if ox.raise_errors:
         raise TypeError(err)
@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Proxies which lazily check the items of iterators and other non-collection
+iterables returned by decorated functions, e.g. those annotated with
+``Iterator[Array[float, X, 64]]``. Each item is checked as it is produced, so
+streams are never materialized. Which items get checked is decided by the
+``sequence-sampling`` option, or the decorator's override for ``return``.
+"""
+import time
+import operator
+import collections
+from typing import Any, Set, Tuple, Callable, Optional
+
+from oxentiel import Oxentiel
+from sympy.core.expr import Expr
+
+from asta.display import CURRENT_HEADER, fail_system
+from asta.origins import check_annotation
+from asta.sampling import SequenceSampler, StreamSampler, get_sequence_sampler
+from asta.constraints import Constraints, as_constraints
+
+ReturnWrapper = Callable[[Any, Set[Expr]], Any]
+
+SYNC_ORIGINS = (
+    collections.abc.Iterable,
+    collections.abc.Iterator,
+    collections.abc.Generator,
+)
+ASYNC_ORIGINS = (
+    collections.abc.AsyncIterable,
+    collections.abc.AsyncIterator,
+    collections.abc.AsyncGenerator,
+)
+
+# pylint: disable=too-few-public-methods
+
+
+class ItemChecker:
+    """
+    Checks the items of a single iterator which are chosen by a sequence
+    sampler. Each item is checked along with the equations from the arguments
+    of the call which returned the iterator, and, if ``share-iterator-dims`` is
+    set, those of all previously checked items.
+
+    Parameters
+    ----------
+    name : ``str``.
+        The name to report items under, e.g. ``return`` for ``return[3]``.
+    annotation : ``Any``.
+        The annotation of each item, or ``None`` to skip checking items.
+    return_annotation : ``Any``.
+        The annotation of a generator's return value, or ``None``.
+    equations : ``Constraints``.
+        The equations from the arguments of the call, which are left unchanged.
+    header : ``str``.
+        The header of the decorated function.
+    sequence_sampler : ``SequenceSampler``.
+        The sampler which chooses the items to check.
+    length : ``int``.
+        The number of items the iterator will produce, or ``0`` if unknown.
+    ox : ``Oxentiel``.
+        The asta configuration.
+    """
+
+    __slots__ = (
+        "name",
+        "annotation",
+        "return_annotation",
+        "equations",
+        "header",
+        "sequence_sampler",
+        "stream",
+        "ox",
+        "index",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        annotation: Any,
+        return_annotation: Any,
+        equations: Constraints,
+        header: str,
+        sequence_sampler: SequenceSampler,
+        length: int,
+        ox: Oxentiel,
+    ) -> None:
+        self.name = name
+        self.annotation = annotation
+        self.return_annotation = return_annotation
+        self.equations = equations
+        self.header = header
+        self.sequence_sampler = sequence_sampler
+        self.stream = StreamSampler(sequence_sampler, length)
+        self.ox = ox
+        self.index = 0
+
+    def restart(self, length: int) -> "ItemChecker":
+        """ Return a checker for a new pass, of ``length`` items, over the iterable. """
+        return ItemChecker(
+            self.name,
+            self.annotation,
+            self.return_annotation,
+            self.equations,
+            self.header,
+            self.sequence_sampler,
+            length,
+            self.ox,
+        )
+
+    def check(self, item: Any) -> None:
+        """ Check the next item, if it's sampled. """
+        index = self.index
+        self.index = index + 1
+        if self.annotation is None or not self.stream.sample(index):
+            return
+        start = time.perf_counter()
+        equations = self.check_value(f"{self.name}[{index}]", item, self.annotation)
+        self.stream.spent += time.perf_counter() - start
+        if self.ox.share_iterator_dims:
+            self.equations = equations
+
+    def check_return(self, value: Any) -> None:
+        """ Check the value a generator returned. """
+        if self.return_annotation is not None:
+            self.check_value(self.name, value, self.return_annotation)
+
+    def check_value(self, name: str, value: Any, annotation: Any) -> Constraints:
+        """ Check ``value`` against ``annotation``, and solve the equations. """
+        token = CURRENT_HEADER.set(self.header)
+        try:
+            equations = self.equations.copy()
+            equations = check_annotation(name, value, annotation, equations, self.ox)
+            solvable, symbols, solutions = equations.solve()
+            if not solvable and equations.conflict is None:
+                fail_system(equations, symbols, solutions, self.ox)
+        finally:
+            CURRENT_HEADER.reset(token)
+        return equations
+
+
+class CheckedIterator:
+    """
+    An iterator which checks each sampled item of ``iterator`` as it is
+    produced. Other attributes are looked up on ``iterator``.
+    """
+
+    __slots__ = ("iterator", "checker")
+
+    def __init__(self, iterator: Any, checker: ItemChecker) -> None:
+        self.iterator = iterator
+        self.checker = checker
+
+    def __iter__(self) -> "CheckedIterator":
+        return self
+
+    def __next__(self) -> Any:
+        item = next(self.iterator)
+        self.checker.check(item)
+        return item
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.iterator, name)
+
+
+class CheckedIterable:
+    """
+    An iterable which is neither an iterator nor a collection, like a data
+    loader. Each iterator it returns checks its items, counting from zero.
+    Other attributes are looked up on ``iterable``.
+    """
+
+    __slots__ = ("iterable", "checker")
+
+    def __init__(self, iterable: Any, checker: ItemChecker) -> None:
+        self.iterable = iterable
+        self.checker = checker
+
+    def __iter__(self) -> CheckedIterator:
+        checker = self.checker.restart(operator.length_hint(self.iterable))
+        return CheckedIterator(iter(self.iterable), checker)
+
+    def __len__(self) -> int:
+        return len(self.iterable)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.iterable, name)
+
+
+class CheckedGenerator(CheckedIterator):
+    """ A generator which checks each yielded item, and the return value. """
+
+    __slots__ = ()
+
+    def __next__(self) -> Any:
+        return self.send(None)
+
+    def send(self, value: Any) -> Any:
+        """ Send ``value`` into the generator, and check what it yields. """
+        try:
+            item = self.iterator.send(value)
+        except StopIteration as stop:
+            self.checker.check_return(stop.value)
+            raise
+        self.checker.check(item)
+        return item
+
+    def throw(self, *args: Any) -> Any:
+        """ Raise an exception in the generator, and check what it yields. """
+        try:
+            item = self.iterator.throw(*args)
+        except StopIteration as stop:
+            self.checker.check_return(stop.value)
+            raise
+        self.checker.check(item)
+        return item
+
+    def close(self) -> None:
+        """ Close the generator. """
+        self.iterator.close()
+
+
+class CheckedAsyncIterator:
+    """
+    An async iterator which checks each sampled item of ``iterator``. Other
+    attributes are looked up on ``iterator``.
+    """
+
+    __slots__ = ("iterator", "checker")
+
+    def __init__(self, iterator: Any, checker: ItemChecker) -> None:
+        self.iterator = iterator
+        self.checker = checker
+
+    def __aiter__(self) -> "CheckedAsyncIterator":
+        return self
+
+    async def __anext__(self) -> Any:
+        item = await self.iterator.__anext__()
+        self.checker.check(item)
+        return item
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.iterator, name)
+
+
+class CheckedAsyncIterable:
+    """ An async iterable whose async iterators check their items. """
+
+    __slots__ = ("iterable", "checker")
+
+    def __init__(self, iterable: Any, checker: ItemChecker) -> None:
+        self.iterable = iterable
+        self.checker = checker
+
+    def __aiter__(self) -> CheckedAsyncIterator:
+        iterator = self.iterable.__aiter__()
+        checker = self.checker.restart(operator.length_hint(self.iterable))
+        return CheckedAsyncIterator(iterator, checker)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.iterable, name)
+
+
+class CheckedAsyncGenerator(CheckedAsyncIterator):
+    """ An async generator which checks each yielded item. """
+
+    __slots__ = ()
+
+    async def __anext__(self) -> Any:
+        return await self.asend(None)
+
+    async def asend(self, value: Any) -> Any:
+        """ Send ``value`` into the generator, and check what it yields. """
+        item = await self.iterator.asend(value)
+        self.checker.check(item)
+        return item
+
+    async def athrow(self, *args: Any) -> Any:
+        """ Raise an exception in the generator, and check what it yields. """
+        item = await self.iterator.athrow(*args)
+        self.checker.check(item)
+        return item
+
+    async def aclose(self) -> None:
+        """ Close the generator. """
+        await self.iterator.aclose()
+
+
+def compile_return_wrapper(
+    annotation: Any,
+    header: str,
+    ox: Oxentiel,
+    sequence_sampler: Optional[SequenceSampler] = None,
+) -> Optional[ReturnWrapper]:
+    """
+    Return a function which wraps return values annotated with ``annotation``
+    in a checking proxy, or ``None`` if ``annotation`` isn't an iterable type.
+    Collections, like lists, are returned unwrapped, since ``check_iterable()``
+    checks their items directly. Other iterables which aren't iterators are
+    wrapped in proxies whose iterators check their items. Items are chosen by
+    ``sequence_sampler`` if given, else by the ``sequence-sampling`` option.
+    """
+    origin = getattr(annotation, "__origin__", None)
+    if origin not in SYNC_ORIGINS + ASYNC_ORIGINS:
+        return None
+
+    args: Tuple[Any, ...] = getattr(annotation, "__args__", None) or ()
+    parameters = getattr(annotation, "__parameters__", ())
+    item_annotation = args[0] if args and args[0] not in (Any, *parameters) else None
+    return_annotation: Optional[Any] = None
+    if origin is collections.abc.Generator and len(args) == 3:
+        if args[2] not in (Any, *parameters):
+            return_annotation = args[2]
+
+    def _wrap(value: Any, equations: Set[Expr]) -> Any:
+        """ Wrap ``value`` in a proxy which checks its items. """
+        checker = ItemChecker(
+            "return",
+            item_annotation,
+            return_annotation,
+            as_constraints(equations),
+            header,
+            sequence_sampler or get_sequence_sampler(ox),
+            operator.length_hint(value),
+            ox,
+        )
+        if origin in SYNC_ORIGINS:
+            if isinstance(value, collections.abc.Generator):
+                return CheckedGenerator(value, checker)
+            if isinstance(value, collections.abc.Iterator):
+                return CheckedIterator(value, checker)
+            if isinstance(value, collections.abc.Collection):
+                return value
+            return CheckedIterable(value, checker)
+
+        if isinstance(value, collections.abc.AsyncGenerator):
+            return CheckedAsyncGenerator(value, checker)
+        if isinstance(value, collections.abc.AsyncIterator):
+            return CheckedAsyncIterator(value, checker)
+        return CheckedAsyncIterable(value, checker)
+
+    return _wrap
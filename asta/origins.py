@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """ Functions for checking type annotations and their origin types. """
+import abc
 import inspect
 import collections
 from io import IOBase, RawIOBase, TextIOBase, BufferedIOBase
@@ -17,17 +18,27 @@ from typing import (
     BinaryIO,
     Callable,
     Sequence,
+    Hashable,
+    Iterable,
+    TypeVar,
+    Optional,
+    FrozenSet,
     AbstractSet,
 )
 
 from oxentiel import Oxentiel
 from sympy.core.expr import Expr
 
+import asta.dims
+import asta.shapes
 from asta.array import Array
-from asta.utils import attrcheck, shapecheck
+from asta.cache import leaf_signature
+from asta.utils import attrcheck, shapecheck, get_matcher
 from asta._array import _ArrayMeta
 from asta.classes import SubscriptableMeta
+from asta.constraints import Constraints, as_constraints
 from asta.display import (
+    PROBING,
     fail_io,
     fail_set,
     fail_dict,
@@ -42,12 +53,15 @@ from asta.display import (
     fail_text_io,
     fail_argument,
     fail_callable,
+    fail_conflict,
     fail_fallback,
+    fail_iterable,
     fail_protocol,
     fail_sequence,
     fail_subclass,
     get_type_name,
     pass_argument,
+    CURRENT_HEADER,
     fail_binary_io,
     qualified_name,
     fail_namedtuple,
@@ -57,22 +71,31 @@ from asta.display import (
     fail_too_many_args,
     type_representation,
 )
-from asta.constants import _TORCH_IMPORTED, _TENSORFLOW_IMPORTED, NoneType, tf, torch
+from asta.backends import get_wired
+from asta.sampling import get_sequence_sampler
+from asta.unusable import UnusableMeta
+from asta.constants import NoneType, GENERIC_TYPES
 from asta.substitution import substitute
 
-METAMAP: Dict[type, SubscriptableMeta] = {_ArrayMeta: Array}
+K = TypeVar("K")
+V = TypeVar("V")
 
-if _TORCH_IMPORTED:
-    from asta.tensor import Tensor
-    from asta._tensor import _TensorMeta
+Dispatch = Callable[[str, Any, Any, Constraints, Oxentiel], Constraints]
+Predicate = Callable[[Any, Any, Oxentiel], bool]
 
-    METAMAP[_TensorMeta] = Tensor
+# The number of entries after which each of the caches below starts over.
+CACHE_SIZE = 4096
 
-if _TENSORFLOW_IMPORTED:
-    from asta.tftensor import TFTensor
-    from asta._tftensor import _TFTensorMeta
+# Refreshed annotations and the dims and shapes generations they were computed
+# for, keyed by ``id`` of the original annotation and the ``dims.scope()`` key.
+# Entries hold a reference to the original, so its ``id`` can't be reused while
+# it's cached.
+REFRESHED: Dict[
+    Tuple[int, FrozenSet], Tuple[SubscriptableMeta, Tuple[int, int], SubscriptableMeta]
+] = {}
 
-    METAMAP[_TFTensorMeta] = TFTensor
+# Backend metaclasses are added by ``get_subscriptable_class()`` once wired.
+METAMAP: Dict[type, SubscriptableMeta] = {_ArrayMeta: Array}
 
 try:
     from typing import Literal  # type: ignore[attr-defined]
@@ -82,18 +105,63 @@ except ImportError:
 # pylint: disable=too-many-lines, too-many-nested-blocks, too-many-branches
 
 
+def remember(cache: Dict[K, V], key: K, value: V) -> None:
+    """
+    Add an entry to one of the caches in this module, starting over once it's
+    full, so that annotations and types it references can be freed.
+    """
+    if len(cache) >= CACHE_SIZE:
+        cache.clear()
+    cache[key] = value
+
+
+def get_subscriptable_class(meta: type) -> SubscriptableMeta:
+    """ Return the top-level class with metaclass ``meta``, e.g. ``Array``. """
+    if meta not in METAMAP:
+        for subscriptable_class in get_wired().values():
+            METAMAP[type(subscriptable_class)] = subscriptable_class
+    return METAMAP[meta]
+
+
 def refresh(
     annotation: SubscriptableMeta, ox: Oxentiel
 ) -> Tuple[SubscriptableMeta, bool]:
-    """ Load an asta type annotation containing classical placeholders. """
+    """
+    Load an asta type annotation containing classical placeholders. The result
+    is reused until the value of some dim or shape changes.
+    """
+    generation = (asta.dims.generation, asta.shapes.generation)
+    key = (id(annotation), asta.dims.scope_var.get().key)
+    entry = REFRESHED.get(key)
+    if entry is not None and entry[0] is annotation and entry[1] == generation:
+        return entry[2], True
+
+    refreshed_annotation, initialized, complete = substitute_annotation(annotation, ox)
+
+    # Failures which don't raise must be reported again next time.
+    if complete and ox.raise_errors:
+        remember(REFRESHED, key, (annotation, generation, refreshed_annotation))
+
+    return refreshed_annotation, initialized
+
+
+def substitute_annotation(
+    annotation: SubscriptableMeta, ox: Oxentiel
+) -> Tuple[SubscriptableMeta, bool, bool]:
+    """
+    Substitute the values of dims and shapes into ``annotation``. Returns the
+    substituted annotation, whether all placeholders in it are initialized, and
+    whether all dims and placeholders in it had values.
+    """
     dtype = annotation.dtype
     shape = annotation.shape
     dimvars: List[Any] = []
     initialized = True
+    uninitialized_names: Set[str] = set()
 
     if annotation.shape is not None:
 
-        dimvars, _, initialized = substitute(shape, ox)
+        dimvars, uninitialized_names, initialized = substitute(shape, ox)
 
         # Unpack tuple elements of ``dimvars``.
         unpacked: List[Any] = []
@@ -106,27 +174,32 @@ def refresh(
 
         shape = tuple(dimvars)
     # Note we're guaranteed that ``annotation`` has type ``SubscriptableMeta``.
-    subscriptable_class = METAMAP[type(annotation)]
-
     refreshed_annotation: SubscriptableMeta
     if shape is not None:
+        subscriptable_class = get_subscriptable_class(type(annotation))
         if dtype is not None:
             refreshed_annotation = subscriptable_class[dtype, shape]  # type: ignore
         else:
             refreshed_annotation = subscriptable_class[shape]  # type: ignore
     elif dtype is not None:
+        subscriptable_class = get_subscriptable_class(type(annotation))
         refreshed_annotation = subscriptable_class[dtype]
     else:
         refreshed_annotation = annotation
 
-    return refreshed_annotation, initialized
+    complete = initialized and not uninitialized_names
+    return refreshed_annotation, initialized, complete
 
 
 def check_asta(
-    name: str, value: Any, annotation: Any, equations: Set[Expr], ox: Oxentiel
-) -> Set[Expr]:
+    name: str, value: Any, annotation: Any, equations: Constraints, ox: Oxentiel
+) -> Constraints:
     """ Check asta subscriptable class types. """
 
+    # Swap out ``Tensor`` and ``TFTensor`` stand-ins for the real classes.
+    if isinstance(annotation, UnusableMeta):
+        annotation = annotation.resolve()
+
     annotation, initialized = refresh(annotation, ox)
 
     # If we haven't set the value of a placeholder used in the annotation, e.g.
@@ -135,16 +208,13 @@ def check_asta(
     if not initialized:
         return equations
 
-    # Check if the literal ``value`` matches the annotation.
-    rep: str = type_representation(value)
-
     # If the isinstance check fails, print/raise an error.
     if not isinstance(value, annotation):
-        fail_argument(name, annotation, rep, ox)
+        fail_argument(name, annotation, type_representation(value), ox)
 
     # Otherwise, print a pass.
     else:
-        pass_argument(name, annotation, rep, ox)
+        pass_argument(name, annotation, value, ox)
 
         # Update equation set.
         shape_equations: Set[Expr] = set()
@@ -152,24 +222,108 @@ def check_asta(
 
         if annotation.shape is not None:
 
-            # HARDCODE
             # Handle case where type(shape) != tuple, e.g. ``torch.Size``.
             value_shape = tuple(value.shape)
-            assert not isinstance(value_shape, (torch.Size, tf.TensorShape))
+
+            # Dimensions of symbols bound earlier in the call are compared as
+            # integers, without building any equations.
+            fixed = get_matcher(annotation.shape).fixed
+            if (
+                fixed is not None
+                and not annotation.kwattrs
+                and equations.determines(fixed, value_shape)
+            ):
+                return equations
 
             # Grab equations from shapecheck call.
             shape_match, shape_equations = shapecheck(value_shape, annotation.shape)
             attr_match, attr_equations = attrcheck(value, annotation.kwattrs)
             assert shape_match and attr_match
 
-        equations = equations.union(shape_equations, attr_equations)
+        conflict = equations.extend(shape_equations.union(attr_equations), name)
+        if conflict is not None:
+            fail_conflict(name, *conflict, ox)
+
+    return equations
+
+
+def check_elements(
+    name: str, container: Any, value_type: Any, equations: Constraints, ox: Oxentiel
+) -> Constraints:
+    """
+    Check the elements of ``container`` chosen by the sequence sampler against
+    ``value_type``, reporting them as ``name[i]``. Elements are checked as
+    they're selected, so the container is never copied, and the ``time``
+    strategy's budget covers the checks themselves. Containers of plain classes
+    are checked once per distinct type of element, until one fails, and
+    containers of arrays or tensors once per distinct type, dtype and shape.
+    """
+    checker = get_checker(value_type, ox)
+    if checker is check_nothing:
+        return equations
+    elements = get_sequence_sampler(ox).select(container)
+
+    # Plain classes fall back to checking each element once one fails, so that
+    # failures are reported from the first offending index.
+    if checker in TYPE_DETERMINED:
+        predicate = PREDICATES[checker]
+        matched: Optional[Set[type]] = set()
+        for i, v in elements:
+            if matched is not None and (
+                type(v) in matched
+                or matches_type(v, value_type, predicate, matched, ox)
+            ):
+                continue
+            matched = None
+            equations = check_annotation(f"{name}[{i}]", v, value_type, equations, ox)
+        return equations
+
+    # Non-raising failures are still reported per element.
+    if (
+        isinstance(value_type, SubscriptableMeta)
+        and not value_type.kwattrs
+        and ox.raise_errors
+    ):
+        signatures: Set[Hashable] = set()
+        for i, v in elements:
+            try:
+                sig = leaf_signature(v)
+                if sig in signatures:
+                    continue
+                signatures.add(sig)
+            except TypeError:
+                pass
+            equations = check_asta(f"{name}[{i}]", v, value_type, equations, ox)
+        return equations
+
+    for i, v in elements:
+        equations = check_annotation(f"{name}[{i}]", v, value_type, equations, ox)
 
     return equations
 
 
+def matches_type(
+    value: Any, value_type: Any, predicate: Predicate, matched: Set[type], ox: Oxentiel
+) -> bool:
+    """
+    Whether ``value`` matches ``value_type``, whose checker's ``predicate`` only
+    depends on the type of the value. Callers skip values of a type in
+    ``matched``, and the types of those which are checked and match are added
+    to it. Failures are neither raised nor printed.
+    """
+    value_cls = type(value)
+    try:
+        match = predicate(value, value_type, ox)
+    except TypeError:
+        return False
+    if match:
+        matched.add(value_cls)
+    return match
+
+
 def check_typed_dict(
-    name: str, value: Any, annotation: Any, equations: Set[Expr], ox: Oxentiel
-) -> Set[Expr]:
+    name: str, value: Any, annotation: Any, equations: Constraints, ox: Oxentiel
+) -> Constraints:
     """ Typecheck a typed dict. """
 
     # If the argument is not a dict, we're aleady in trouble.
@@ -202,65 +356,95 @@ def check_typed_dict(
 
 def check_callable(name: str, value: Any, annotation: Any, ox: Oxentiel) -> None:
     """ Check an argument with annotation ``callable`` or ``Callable[]``. """
+    if matches_callable(value, annotation, ox):
+        return
     if not callable(value):
         fail_callable(name, annotation, qualified_name(value), ox)
 
-    if annotation.__args__:
-        try:
-            signature = inspect.signature(value)
-        except (TypeError, ValueError):
-            return
+    arity = get_arity(value, annotation)
+    if arity is not None:
+        num_args, num_mandatory_args, has_varargs = arity
 
-        if hasattr(annotation, "__result__"):
-            # Python 3.5
-            argument_types = annotation.__args__
-            check_args = argument_types is not Ellipsis
-        else:
-            # Python 3.6+
-            argument_types = annotation.__args__[:-1]
-            check_args = argument_types != (Ellipsis,)
-
-        if check_args:
-            # The callable must not have keyword-only arguments without defaults.
-            unfulfilled_kwonlyargs = [
-                param.name
-                for param in signature.parameters.values()
-                if param.kind == inspect.Parameter.KEYWORD_ONLY
-                and param.default == inspect.Parameter.empty
-            ]
-            if unfulfilled_kwonlyargs:
-                # NOTE: Should this output a warning?
-                return
-
-            num_mandatory_args = len(
-                [
-                    param.name
-                    for param in signature.parameters.values()
-                    if param.kind
-                    in (
-                        inspect.Parameter.POSITIONAL_ONLY,
-                        inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                    )
-                    and param.default is inspect.Parameter.empty
-                ]
-            )
-            has_varargs = any(
-                param
-                for param in signature.parameters.values()
-                if param.kind == inspect.Parameter.VAR_POSITIONAL
-            )
+        # NOTE: Consider adding true recursive checking.
+        if num_mandatory_args > num_args:
+            fail_too_many_args(name, num_args, num_mandatory_args, ox)
+        elif not has_varargs and num_mandatory_args < num_args:
+            fail_too_few_args(name, num_args, num_mandatory_args, ox)
 
-            # NOTE: Consider adding true recursive checking.
-            if num_mandatory_args > len(argument_types):
-                fail_too_many_args(name, len(argument_types), num_mandatory_args, ox)
-            elif not has_varargs and num_mandatory_args < len(argument_types):
-                fail_too_few_args(name, len(argument_types), num_mandatory_args, ox)
-    return
+
+def matches_callable(value: Any, annotation: Any, ox: Oxentiel) -> bool:
+    """ Whether ``value`` matches ``callable`` or ``Callable[]``. """
+    # pylint: disable=unused-argument
+    if not callable(value):
+        return False
+    arity = get_arity(value, annotation)
+    if arity is None:
+        return True
+    num_args, num_mandatory_args, has_varargs = arity
+    return num_mandatory_args == num_args or (
+        has_varargs and num_mandatory_args < num_args
+    )
+
+
+def get_arity(value: Any, annotation: Any) -> Optional[Tuple[int, int, bool]]:
+    """
+    Return the number of arguments ``Callable[]`` annotation ``annotation``
+    passes, the number of mandatory positional parameters of ``value``, and
+    whether it takes ``*args``, or ``None`` if these can't be compared.
+    """
+    if not annotation.__args__:
+        return None
+    try:
+        signature = inspect.signature(value)
+    except (TypeError, ValueError):
+        return None
+
+    if hasattr(annotation, "__result__"):
+        # Python 3.5
+        argument_types = annotation.__args__
+        check_args = argument_types is not Ellipsis
+    else:
+        # Python 3.6+
+        argument_types = annotation.__args__[:-1]
+        check_args = argument_types != (Ellipsis,)
+
+    if not check_args:
+        return None
+
+    # The callable must not have keyword-only arguments without defaults.
+    unfulfilled_kwonlyargs = [
+        param.name
+        for param in signature.parameters.values()
+        if param.kind == inspect.Parameter.KEYWORD_ONLY
+        and param.default == inspect.Parameter.empty
+    ]
+    if unfulfilled_kwonlyargs:
+        # NOTE: Should this output a warning?
+        return None
+
+    num_mandatory_args = len(
+        [
+            param.name
+            for param in signature.parameters.values()
+            if param.kind
+            in (
+                inspect.Parameter.POSITIONAL_ONLY,
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            )
+            and param.default is inspect.Parameter.empty
+        ]
+    )
+    has_varargs = any(
+        param
+        for param in signature.parameters.values()
+        if param.kind == inspect.Parameter.VAR_POSITIONAL
+    )
+    return len(argument_types), num_mandatory_args, has_varargs
 
 
 def check_tuple(
-    name: str, value: Any, annotation: Any, equations: Set[Expr], ox: Oxentiel
-) -> Set[Expr]:
+    name: str, value: Any, annotation: Any, equations: Constraints, ox: Oxentiel
+) -> Constraints:
     """ Check an argument with annotation ``tuple`` or ``Tuple[]``. """
 
     # Specialized check for NamedTuples.
@@ -294,11 +478,7 @@ def check_tuple(
             tuple_params = annotation.__args__
 
         if use_ellipsis:
-            elem_type = tuple_params[0]
-            for i, elem in enumerate(value):
-                equations = check_annotation(
-                    f"{name}[{i}]", elem, elem_type, equations, ox
-                )
+            equations = check_elements(name, value, tuple_params[0], equations, ox)
         elif tuple_params == ((),):
             if value != ():
                 fail_empty_tuple(name, qualified_name(value), ox)
@@ -317,8 +497,8 @@ def check_tuple(
 
 
 def check_list(
-    name: str, value: Any, annotation: Any, equations: Set[Expr], ox: Oxentiel
-) -> Set[Expr]:
+    name: str, value: Any, annotation: Any, equations: Constraints, ox: Oxentiel
+) -> Constraints:
     """ Check an argument with annotation ``list`` or ``List[]``. """
     if not isinstance(value, list):
         fail_list(name, annotation, qualified_name(value), ox)
@@ -329,21 +509,14 @@ def check_list(
             value_type = annotation.__args__[0]
             if value_type is not Any:
 
-                value_iterable = value
-                if not ox.check_all_sequence_elements:
-                    value_iterable = value_iterable[:1]
-                for i, v in enumerate(value_iterable):
-                    element_equations = check_annotation(
-                        f"{name}[{i}]", v, value_type, equations, ox
-                    )
-                    equations = equations.union(element_equations)
+                equations = check_elements(name, value, value_type, equations, ox)
 
     return equations
 
 
 def check_sequence(
-    name: str, value: Any, annotation: Any, equations: Set[Expr], ox: Oxentiel
-) -> Set[Expr]:
+    name: str, value: Any, annotation: Any, equations: Constraints, ox: Oxentiel
+) -> Constraints:
     """ Check an argument with annotation ``Sequence[*]``. """
     if not isinstance(value, collections.abc.Sequence):
         fail_sequence(name, annotation, qualified_name(value), ox)
@@ -353,21 +526,57 @@ def check_sequence(
         value_type = annotation.__args__[0]
         if value_type is not Any:
 
-            value_iterable = value
-            if not ox.check_all_sequence_elements:
-                value_iterable = value_iterable[:1]
-            for i, v in enumerate(value_iterable):
-                element_equations = check_annotation(
-                    f"{name}[{i}]", v, value_type, equations, ox
-                )
-                equations = equations.union(element_equations)
+            equations = check_elements(name, value, value_type, equations, ox)
+
+    return equations
+
+
+# Names of the iterable protocols, for error messages.
+ITERABLE_KINDS = {
+    collections.abc.Iterable: "an iterable",
+    collections.abc.Iterator: "an iterator",
+    collections.abc.Generator: "a generator",
+    collections.abc.AsyncIterable: "an async iterable",
+    collections.abc.AsyncIterator: "an async iterator",
+    collections.abc.AsyncGenerator: "an async generator",
+}
+
+
+def check_iterable(
+    name: str, value: Any, annotation: Any, equations: Constraints, ox: Oxentiel
+) -> Constraints:
+    """
+    Check an argument with annotation ``Iterable[*]``, ``Iterator[*]``,
+    ``Generator[*]`` or one of their async counterparts. Only collections have
+    their items checked here. Other iterables, like iterators or data loaders,
+    are never iterated, so only their type is checked. The items of decorated
+    functions' non-collection return values are checked lazily by proxies from
+    ``asta.iterators``, but arguments can't be replaced by such proxies.
+    """
+    origin = annotation.__origin__
+    if not isinstance(value, origin):
+        kind = ITERABLE_KINDS[origin]
+        fail_iterable(name, kind, annotation, qualified_name(value), ox)
+        return equations
+
+    # Materialized iterables, like lists, can be checked like sequences.
+    if origin is not collections.abc.Iterable:
+        return equations
+    if isinstance(value, collections.abc.Iterator) or not isinstance(
+        value, collections.abc.Collection
+    ):
+        return equations
+    if annotation.__args__ not in (None, annotation.__parameters__):
+        value_type = annotation.__args__[0]
+        if value_type is not Any:
+            equations = check_elements(name, value, value_type, equations, ox)
 
     return equations
 
 
 def check_dict(
-    name: str, value: Any, annotation: Any, equations: Set[Expr], ox: Oxentiel
-) -> Set[Expr]:
+    name: str, value: Any, annotation: Any, equations: Constraints, ox: Oxentiel
+) -> Constraints:
     """ Check an argument with annotation ``Dict[*]``. """
     if not isinstance(value, dict):
         fail_dict(name, annotation, qualified_name(value), ox)
@@ -377,22 +586,55 @@ def check_dict(
         if annotation.__args__ not in (None, annotation.__parameters__):
             key_type, value_type = annotation.__args__
             if key_type is not Any or value_type is not Any:
-                for k, v in value.items():
-                    key_equations = check_annotation(
-                        f"{name}.<key>", k, key_type, equations, ox
-                    )
-                    val_equations = check_annotation(
-                        f"{name}[{k}]", v, value_type, equations, ox
-                    )
+                equations = check_items(
+                    name, value, key_type, value_type, equations, ox
+                )
+
+    return equations
 
-                    equations = equations.union(key_equations, val_equations)
+
+def check_items(
+    name: str,
+    value: Any,
+    key_type: Any,
+    value_type: Any,
+    equations: Constraints,
+    ox: Oxentiel,
+) -> Constraints:
+    """
+    Check the items of the dict ``value`` chosen by the sequence sampler, as
+    they're selected. Keys and values annotated with plain classes are checked
+    once per distinct type, until one fails.
+    """
+    key_matched: Optional[Set[type]] = None
+    key_checker = get_checker(key_type, ox)
+    if key_checker in TYPE_DETERMINED:
+        key_matched = set()
+    value_matched: Optional[Set[type]] = None
+    value_checker = get_checker(value_type, ox)
+    if value_checker in TYPE_DETERMINED:
+        value_matched = set()
+
+    for _, (k, v) in get_sequence_sampler(ox).select(value.items()):
+        if key_matched is None or not (
+            type(k) in key_matched
+            or matches_type(k, key_type, PREDICATES[key_checker], key_matched, ox)
+        ):
+            key_matched = None
+            equations = check_annotation(f"{name}.<key>", k, key_type, equations, ox)
+        if value_matched is None or not (
+            type(v) in value_matched
+            or matches_type(v, value_type, PREDICATES[value_checker], value_matched, ox)
+        ):
+            value_matched = None
+            equations = check_annotation(f"{name}[{k}]", v, value_type, equations, ox)
 
     return equations
 
 
 def check_set(
-    name: str, value: Any, annotation: Any, equations: Set[Expr], ox: Oxentiel
-) -> Set[Expr]:
+    name: str, value: Any, annotation: Any, equations: Constraints, ox: Oxentiel
+) -> Constraints:
     """ Check an argument with annotation ``Set[*]``. """
     if not isinstance(value, AbstractSet):
         fail_set(name, annotation, qualified_name(value), ox)
@@ -402,18 +644,27 @@ def check_set(
         if annotation.__args__ not in (None, annotation.__parameters__):
             value_type = annotation.__args__[0]
             if value_type is not Any:
-                for v in value:
-                    set_equations = check_annotation(
+                matched: Optional[Set[type]] = None
+                checker = get_checker(value_type, ox)
+                if checker in TYPE_DETERMINED:
+                    matched = set()
+                for _, v in get_sequence_sampler(ox).select(value):
+                    if matched is not None and (
+                        type(v) in matched
+                        or matches_type(v, value_type, PREDICATES[checker], matched, ox)
+                    ):
+                        continue
+                    matched = None
+                    equations = check_annotation(
                         f"{name}.<set_element>", v, value_type, equations, ox
                     )
-                    equations = equations.union(set_equations)
 
     return equations
 
 
 def check_union(
-    name: str, value: Any, annotation: Any, equations: Set[Expr], ox: Oxentiel
-) -> Set[Expr]:
+    name: str, value: Any, annotation: Any, equations: Constraints, ox: Oxentiel
+) -> Constraints:
     """ Typecheck an argument annotated with ``Union[]``. """
     if hasattr(annotation, "__union_params__"):
         # Python 3.5
@@ -422,20 +673,128 @@ def check_union(
         # Python 3.6+
         union_params = annotation.__args__
 
-    for type_ in union_params:
-        try:
-            equations = check_annotation(name, value, type_, equations, ox)
-            return equations
-        except TypeError as _err:
-            pass
+    # ``Optional[*]`` arguments which are ``None`` need no further checks.
+    if value is None and NoneType in union_params:
+        return equations
+
+    key = (CURRENT_HEADER.get(), name, id(annotation))
+    site = UNION_SITES.get(key)
+    if site is None or site.annotation is not annotation:
+        site = UnionSite(annotation, union_params)
+        remember(UNION_SITES, key, site)
+
+    # Failures of individual members raise without being printed.
+    token = PROBING.set(True)
+    try:
+        for position, member in enumerate(site.order):
+            mark = equations.mark()
+            member_equations = match_member(name, value, member, equations, ox)
+            if member_equations is not None:
+                site.record(position)
+                return member_equations
+
+            # Forget whatever the member added before it failed.
+            equations.rollback(mark)
+    finally:
+        PROBING.reset(token)
 
     typelist = ", ".join(get_type_name(t) for t in union_params)
     fail_union(name, typelist, qualified_name(value), ox)
     return equations
 
 
+class UnionSite:
+    """
+    The members of a ``Union`` annotation in the order in which they're tried
+    at one call site. If no member can add equations, so that the order can't
+    change the outcome of a check, members move towards the front as they
+    match more often than their predecessors.
+
+    Parameters
+    ----------
+    annotation : ``Any``.
+        The ``Union`` annotation, kept so that its ``id`` can't be reused.
+    members : ``Tuple[Any, ...]``.
+        The members of ``annotation``, in the order they were declared.
+    """
+
+    __slots__ = ("annotation", "order", "hits", "adaptive")
+
+    def __init__(self, annotation: Any, members: Tuple[Any, ...]) -> None:
+        self.annotation = annotation
+        self.order = tuple(members)
+        self.hits: Dict[int, int] = {}
+        self.adaptive = all(is_equation_free(member) for member in members)
+
+    def record(self, position: int) -> None:
+        """ Count a match of the member at ``position`` in the current order. """
+        if not self.adaptive:
+            return
+        order = self.order
+        hits = self.hits
+        member_hits = hits.get(id(order[position]), 0) + 1
+        hits[id(order[position])] = member_hits
+
+        # Replace rather than mutate the order, since other threads may be using it.
+        if position > 0 and member_hits > hits.get(id(order[position - 1]), 0):
+            self.order = (
+                order[: position - 1]
+                + (order[position], order[position - 1])
+                + order[position + 1 :]
+            )
+
+
+# Call sites of ``Union`` annotations, keyed by function header, argument name,
+# and ``id`` of the annotation.
+UNION_SITES: Dict[Tuple[str, str, int], UnionSite] = {}
+
+
+def is_equation_free(member: Any) -> bool:
+    """ Whether values can match the ``Union`` member ``member`` without equations. """
+    if member is NoneType or member in GENERIC_TYPES:
+        return True
+    if isinstance(member, SubscriptableMeta):
+        if member.kwattrs:
+            return False
+        shape = member.shape
+        return shape is None or all(
+            elem is Ellipsis or isinstance(elem, int) for elem in shape
+        )
+    return False
+
+
+def match_member(
+    name: str, value: Any, member: Any, equations: Constraints, ox: Oxentiel
+) -> Optional[Constraints]:
+    """
+    Check ``value`` against one member of a ``Union`` while probing. Returns
+    the resulting equations, or ``None`` if it doesn't match. Mismatched asta
+    types and members with a predicate in ``PREDICATES`` are rejected without
+    building an error message.
+    """
+    if member is NoneType:
+        return equations if value is None else None
+    try:
+        if isinstance(member, SubscriptableMeta):
+            if isinstance(member, UnusableMeta):
+                member = member.resolve()
+            refreshed, initialized = refresh(member, ox)
+            if initialized and not isinstance(value, refreshed):
+                return None
+            return check_asta(name, value, member, equations, ox)
+        checker = get_checker(member, ox)
+        predicate = PREDICATES.get(checker)
+        if predicate is not None:
+            return equations if predicate(value, member, ox) else None
+        return checker(name, value, member, equations, ox)
+    except TypeError:
+        return None
+
+
 def check_class(name: str, value: Any, annotation: Any, ox: Oxentiel) -> None:
     """ Check an arbitrary class. """
+    if matches_class(value, annotation, ox):
+        return
     if not inspect.isclass(value):
         fail_class(name, annotation, qualified_name(value), ox)
 
@@ -451,6 +810,17 @@ def check_class(name: str, value: Any, annotation: Any, ox: Oxentiel) -> None:
     return
 
 
+def matches_class(value: Any, annotation: Any, ox: Oxentiel) -> bool:
+    """ Whether ``value`` matches ``type`` or ``Type[]``. """
+    # pylint: disable=unused-argument
+    if not inspect.isclass(value):
+        return False
+    if annotation is Type:
+        return True
+    expected_class = annotation.__args__[0] if annotation.__args__ else None
+    return not expected_class or issubclass(value, expected_class)
+
+
 def check_number(name: str, value: Any, annotation: Any, ox: Oxentiel) -> None:
     """ Check for when ``value`` is in ``(complex, float, int)``. """
     if annotation is complex and not isinstance(value, complex):
@@ -459,6 +829,16 @@ def check_number(name: str, value: Any, annotation: Any, ox: Oxentiel) -> None:
         fail_float(name, qualified_name(value.__class__), ox)
 
 
+def matches_number(value: Any, annotation: Any, ox: Oxentiel) -> bool:
+    """ Whether ``value`` matches ``complex``, ``float`` or ``int``. """
+    # pylint: disable=unused-argument
+    if annotation is complex:
+        return isinstance(value, complex)
+    if annotation is float:
+        return isinstance(value, float)
+    return True
+
+
 def check_io(name: str, value: Any, annotation: Any, ox: Oxentiel) -> None:
     """ Typecheck arguments with *IO annotations. """
     if annotation is TextIO:
@@ -471,26 +851,141 @@ def check_io(name: str, value: Any, annotation: Any, ox: Oxentiel) -> None:
         fail_io(name, qualified_name(value.__class__), ox)
 
 
+def matches_io(value: Any, annotation: Any, ox: Oxentiel) -> bool:
+    """ Whether ``value`` matches an *IO annotation. """
+    # pylint: disable=unused-argument
+    if annotation is TextIO:
+        return isinstance(value, TextIOBase)
+    if annotation is BinaryIO:
+        return isinstance(value, (RawIOBase, BufferedIOBase))
+    return isinstance(value, IOBase)
+
+
 def check_protocol(name: str, value: Any, annotation: Any, ox: Oxentiel) -> None:
     """ Typecheck arguments with protocol annotations. """
-    if not issubclass(type(value), annotation):
+    if not matches_protocol(value, annotation, ox):
         fail_protocol(name, type(value).__qualname__, annotation.__qualname__, ox)
 
 
+def matches_protocol(value: Any, annotation: Any, ox: Oxentiel) -> bool:
+    """ Whether ``value`` matches a protocol annotation. """
+    # pylint: disable=unused-argument
+    value_type = type(value)
+    key = (value_type, annotation, True)
+    match = TYPE_CHECKS.get(key)
+    if match is None:
+        match = issubclass(value_type, annotation)
+        remember(TYPE_CHECKS, key, match)
+    return match
+
+
 def check_literal(name: str, value: Any, annotation: Any, ox: Oxentiel) -> None:
     """ Typecheck a value annotated with ``Literal[*]``. """
-    if value not in annotation.__args__:
+    if not matches_literal(value, annotation, ox):
         fail_literal(name, annotation.__args__, value, ox)
 
 
+def matches_literal(value: Any, annotation: Any, ox: Oxentiel) -> bool:
+    """ Whether ``value`` matches ``Literal[*]``. """
+    # pylint: disable=unused-argument
+    return value in annotation.__args__
+
+
 def check_none(name: str, value: Any, annotation: Any, ox: Oxentiel) -> None:
     """ Typecheck a value annotated with ``NoneType``. """
     if value is not None:
         fail_literal(name, [None], value, ox)
 
 
+def matches_none(value: Any, annotation: Any, ox: Oxentiel) -> bool:
+    """ Whether ``value`` matches ``NoneType``. """
+    # pylint: disable=unused-argument
+    return value is None
+
+
+def check_fallback(name: str, value: Any, annotation: Any, ox: Oxentiel) -> None:
+    """ Typecheck arguments annotated with other classes, like ``str`` and ``int``. """
+    if not matches_fallback(value, annotation, ox):
+        expected = get_fallback_class(annotation)
+        fail_fallback(name, qualified_name(expected), qualified_name(value), ox)
+
+
+def matches_fallback(value: Any, annotation: Any, ox: Oxentiel) -> bool:
+    """ Whether ``value`` is an instance of the class ``annotation``. """
+    # pylint: disable=unused-argument
+    value_type = type(value)
+    key = (value_type, annotation, False)
+
+    # Only plain and abstract classes are guaranteed to decide by type alone.
+    cacheable = value.__class__ is value_type
+    if cacheable:
+        match = TYPE_CHECKS.get(key)
+        if match is not None:
+            return match
+
+    match = isinstance(value, get_fallback_class(annotation))
+    if cacheable and type(annotation) in (type, abc.ABCMeta):
+        remember(TYPE_CHECKS, key, match)
+    return match
+
+
+def get_fallback_class(annotation: Any) -> Any:
+    """ The class or classes values annotated with ``annotation`` must be. """
+    expected = getattr(annotation, "__extra__", None) or annotation
+
+    # As per https://github.com/python/typing/issues/552
+    if expected is bytes:
+        expected = (bytearray, bytes)
+    return expected
+
+
+# Outcomes of protocol and fallback checks, which only depend on the type of
+# the value, keyed by that type, the annotation, and whether it's a protocol.
+TYPE_CHECKS: Dict[Tuple[type, Any, bool], bool] = {}
+
+# Checkers for annotations, keyed by ``id`` of the annotation and whether
+# non-asta types are checked. Entries hold a reference to the annotation, so its
+# ``id`` can't be reused while it's cached.
+DISPATCH: Dict[Tuple[int, bool], Tuple[Any, Dispatch]] = {}
+
+
+def without_equations(checker: Callable[[str, Any, Any, Oxentiel], None]) -> Dispatch:
+    """ Adapt a checker which can't add equations to the ``Dispatch`` signature. """
+
+    def _checker(
+        name: str, value: Any, annotation: Any, equations: Constraints, ox: Oxentiel
+    ) -> Constraints:
+        checker(name, value, annotation, ox)
+        return equations
+
+    return _checker
+
+
+def check_nothing(
+    name: str, value: Any, annotation: Any, equations: Constraints, ox: Oxentiel
+) -> Constraints:
+    """ Accept anything, for annotations which asta doesn't check. """
+    # pylint: disable=unused-argument
+    return equations
+
+
+def matches_anything(value: Any, annotation: Any, ox: Oxentiel) -> bool:
+    """ Accept anything, like ``check_nothing()``. """
+    # pylint: disable=unused-argument
+    return True
+
+
+CHECK_NONE = without_equations(check_none)
+CHECK_NUMBER = without_equations(check_number)
+CHECK_IO = without_equations(check_io)
+CHECK_PROTOCOL = without_equations(check_protocol)
+CHECK_FALLBACK = without_equations(check_fallback)
+CHECK_CALLABLE = without_equations(check_callable)
+CHECK_CLASS = without_equations(check_class)
+CHECK_LITERAL = without_equations(check_literal)
+
 # Equality checks are applied to these.
-ORIGIN_TYPE_CHECKERS = {
+ORIGIN_TYPE_CHECKERS: Dict[Any, Dispatch] = {
     AbstractSet: check_set,
     dict: check_dict,
     Dict: check_dict,
@@ -504,26 +999,118 @@ ORIGIN_TYPE_CHECKERS = {
     tuple: check_tuple,
     Tuple: check_tuple,
     Union: check_union,
+    **{origin: check_iterable for origin in ITERABLE_KINDS},
 }
 
 # We ought to be above version 3.5.2.
 assert Type is not None
-NON_ASTA_INITIAL_CHECKERS = {
-    Callable: check_callable,
-    collections.abc.Callable: check_callable,
-    type: check_class,
-    Type: check_class,
+NON_ASTA_INITIAL_CHECKERS: Dict[Any, Dispatch] = {
+    Callable: CHECK_CALLABLE,
+    collections.abc.Callable: CHECK_CALLABLE,
+    type: CHECK_CLASS,
+    Type: CHECK_CLASS,
 }
+NON_ASTA_CHECKERS: Dict[Any, Dispatch]
 if Literal is not None:
-    NON_ASTA_CHECKERS = {**NON_ASTA_INITIAL_CHECKERS, **{Literal: check_literal}}
+    NON_ASTA_CHECKERS = {**NON_ASTA_INITIAL_CHECKERS, **{Literal: CHECK_LITERAL}}
 else:
     NON_ASTA_CHECKERS = NON_ASTA_INITIAL_CHECKERS
 
+# Boolean forms of the checkers which never add equations, which decide whether
+# a value matches without building failure messages or raising.
+PREDICATES: Dict[Dispatch, Predicate] = {
+    check_nothing: matches_anything,
+    CHECK_NONE: matches_none,
+    CHECK_NUMBER: matches_number,
+    CHECK_IO: matches_io,
+    CHECK_PROTOCOL: matches_protocol,
+    CHECK_FALLBACK: matches_fallback,
+    CHECK_CALLABLE: matches_callable,
+    CHECK_CLASS: matches_class,
+    CHECK_LITERAL: matches_literal,
+}
+
+# Checkers whose outcome only depends on the type of the value, and which never
+# add equations, so that containers need only check one element of each type.
+TYPE_DETERMINED = frozenset(
+    [check_nothing, CHECK_NONE, CHECK_NUMBER, CHECK_IO, CHECK_PROTOCOL, CHECK_FALLBACK]
+)
+
+
+def check_origin(
+    name: str, value: Any, annotation: Any, equations: Constraints, ox: Oxentiel
+) -> Constraints:
+    """ Check against the origin of a generic annotation asta has no checker for. """
+    return check_annotation(name, value, annotation.__origin__, equations, ox)
+
+
+def resolve_checker(annotation: Any, check_non_asta_types: bool) -> Dispatch:
+    """ Classify ``annotation`` and return the function which checks it. """
+    # Get origin type.
+    origin: Any = getattr(annotation, "__origin__", None)
+
+    # Treat asta types.
+    if isinstance(annotation, SubscriptableMeta):
+        return check_asta
+
+    if origin is not None:
+        if origin in ORIGIN_TYPE_CHECKERS:
+            return ORIGIN_TYPE_CHECKERS[origin]
+        if not check_non_asta_types:
+            return check_nothing
+        if origin in NON_ASTA_CHECKERS:
+            return NON_ASTA_CHECKERS[origin]
+        return check_origin
+
+    if not inspect.isclass(annotation):
+        return check_nothing
+
+    if issubclass(annotation, Tuple):  # type: ignore[arg-type]
+        return check_tuple
+    if issubclass(annotation, dict) and hasattr(annotation, "__annotations__"):
+        return check_typed_dict
+    if annotation == NoneType:
+        return CHECK_NONE
+    if not check_non_asta_types:
+        return check_nothing
+
+    if issubclass(annotation, (float, complex)):
+        return CHECK_NUMBER
+    if issubclass(annotation, Callable) and hasattr(  # type: ignore[arg-type]
+        annotation, "__args__"
+    ):
+        # Needed on Python 3.5.0 to 3.5.2
+        return CHECK_CALLABLE
+    if issubclass(annotation, IO):
+        return CHECK_IO
+    if getattr(annotation, "_is_protocol", False):
+        return CHECK_PROTOCOL
+    return CHECK_FALLBACK
+
+
+def get_checker(annotation: Any, ox: Oxentiel) -> Dispatch:
+    """
+    Return the function which checks ``annotation``. Annotations are classified
+    once, and their checkers reused thereafter.
+    """
+    check_non_asta_types = bool(ox.check_non_asta_types)
+    key = (id(annotation), check_non_asta_types)
+    entry = DISPATCH.get(key)
+    if entry is not None and entry[0] is annotation:
+        return entry[1]
+    checker = resolve_checker(annotation, check_non_asta_types)
+    remember(DISPATCH, key, (annotation, checker))
+    return checker
+
 
 def check_annotation(
     name: str, value: Any, annotation: Any, equations: Set[Expr], ox: Oxentiel
-) -> Set[Expr]:
-    """ Check if ``value`` is of type ``annotation`` for asta types only. """
+) -> Constraints:
+    """
+    Check if ``value`` is of type ``annotation`` for asta types only. The
+    equations are added to ``equations`` if it is a ``Constraints``, or to a
+    copy of it otherwise.
+    """
 
     # The solution to the set of equations for each individual annotation
     # should be unique. If there is no solution, print/raise an error. If there
@@ -537,56 +1124,5 @@ def check_annotation(
     # solution, all the annotations' solutions must agree for a given function
     # signature.
 
-    # Get origin type.
-    origin: Any = getattr(annotation, "__origin__", None)
-
-    # Treat asta types.
-    if isinstance(annotation, SubscriptableMeta):
-        equations = check_asta(name, value, annotation, equations, ox)
-
-    elif origin is not None:
-        checker_function_map = ORIGIN_TYPE_CHECKERS
-        if ox.check_non_asta_types:
-            checker_function_map.update(NON_ASTA_CHECKERS)  # type: ignore
-        checker_fn: Callable = checker_function_map[origin]
-        if checker_fn:
-            equations = checker_fn(name, value, annotation, equations, ox)
-        else:
-            equations = check_annotation(name, value, origin, equations, ox)
-    elif inspect.isclass(annotation):
-
-        subclass_callable: bool = issubclass(annotation, Callable)  # type: ignore
-        has_args: bool = hasattr(annotation, "__args__")
-
-        if issubclass(annotation, Tuple):  # type: ignore[arg-type]
-            equations = check_tuple(name, value, annotation, equations, ox)
-        elif issubclass(annotation, dict) and hasattr(annotation, "__annotations__"):
-            equations = check_typed_dict(name, value, annotation, equations, ox)
-        elif annotation == NoneType:
-            check_none(name, value, annotation, ox)
-        elif ox.check_non_asta_types:
-            if issubclass(annotation, (float, complex)):
-                check_number(name, value, annotation, ox)
-            elif subclass_callable and has_args:
-                # Needed on Python 3.5.0 to 3.5.2
-                check_callable(name, value, annotation, ox)
-            elif issubclass(annotation, IO):
-                check_io(name, value, annotation, ox)
-            elif getattr(annotation, "_is_protocol", False):
-                check_protocol(name, value, annotation, ox)
-            else:
-                annotation = (
-                    getattr(annotation, "__extra__", None) or origin or annotation
-                )
-
-                # As per https://github.com/python/typing/issues/552
-                if annotation is bytes:
-                    annotation = (bytearray, bytes)
-
-                # Handles ``str`` and ``int``.
-                if not isinstance(value, annotation):
-                    fail_fallback(
-                        name, qualified_name(annotation), qualified_name(value), ox
-                    )
-
-    return equations
+    checker = get_checker(annotation, ox)
+    return checker(name, value, annotation, as_constraints(equations), ox)
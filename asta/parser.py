@@ -6,7 +6,7 @@ from typing import Any, Dict, Tuple, Union, Optional
 from sympy.core.expr import Expr
 from sympy.core.symbol import Symbol
 
-from asta.utils import is_subtuple
+from asta.utils import get_matcher
 from asta.scalar import Scalar
 from asta.classes import SubscriptableMeta
 from asta.constants import EllipsisType
@@ -88,7 +88,8 @@ def parse_subscript(
         empty_err += "Use '{cls.NAME}[None]' to indicate a scalar."
         raise TypeError(empty_err)
 
-    if isinstance(shape, tuple) and is_subtuple((..., ...), shape, set())[0]:
-        raise TypeError("Invalid shape: repeated '...'")
+    # Compile the shape for matching now, which also rejects repeated '...'.
+    if isinstance(shape, tuple):
+        get_matcher(shape)
 
     return dtype, shape, kwattrs, kind
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" Precompiled per-function check plans for the ``@typechecked`` decorator. """
+import inspect
+from typing import Any, Dict, List, Tuple, Callable, Optional, NamedTuple
+
+from oxentiel import Oxentiel
+
+from asta.cache import Signer, SignatureCache, compile_signer
+from asta.config import parse_number
+from asta.display import get_header
+from asta.sampling import SEQUENCE_SAMPLER, Sampler, SequenceSampler, get_sampler
+from asta.origins import resolve_checker
+from asta.iterators import ReturnWrapper, compile_return_wrapper
+from asta.constraints import Constraints
+
+Checker = Callable[[Any, Constraints], Constraints]
+
+# Names of unannotated class reference parameters.
+REFS = ("self", "cls", "mcs")
+
+
+class CheckPlan(NamedTuple):
+    """
+    Everything ``@typechecked`` needs in order to check a call to a particular
+    function, computed once at decoration time so that the per-call path is a
+    flat loop over prebuilt checkers.
+
+    Attributes
+    ----------
+    header : ``str``.
+        The header printed before checking a call.
+    names : ``Tuple[str, ...]``.
+        The names of the annotated non-return parameters, in annotation order.
+        Positional arguments are bound to these names in order.
+    skip_reference : ``bool``.
+        Whether the first positional argument is an unannotated class
+        reference (``self``, ``cls`` or ``mcs``).
+    defaults : ``Dict[str, Any]``.
+        Default values of all parameters which have them. Never mutated.
+    checkers : ``Tuple[Checker, ...]``.
+        One checker for each name in ``names``.
+    return_checker : ``Optional[Checker]``.
+        The checker for the return value, or ``None`` if it is not annotated.
+    signers : ``Optional[Tuple[Signer, ...]]``.
+        One signer for each name in ``names``, or ``None`` if calls to this
+        function can't be memoized.
+    return_signer : ``Optional[Signer]``.
+        The signer for the return value, or ``None`` if it has none.
+    cache : ``Optional[SignatureCache]``.
+        Signatures of calls which passed, or ``None`` if caching is disabled.
+    sampler : ``Optional[Sampler]``.
+        Decides which calls get checked, or ``None`` if all of them do.
+    return_wrapper : ``Optional[ReturnWrapper]``.
+        Wraps returned iterators in proxies which check their items lazily, or
+        ``None`` if the return value isn't annotated as an iterable.
+    """
+
+    header: str
+    names: Tuple[str, ...]
+    skip_reference: bool
+    defaults: Dict[str, Any]
+    checkers: Tuple[Checker, ...]
+    return_checker: Optional[Checker]
+    signers: Optional[Tuple[Signer, ...]] = None
+    return_signer: Optional[Signer] = None
+    cache: Optional[SignatureCache] = None
+    sampler: Optional[Sampler] = None
+    return_wrapper: Optional[ReturnWrapper] = None
+
+    def bind(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> List[Any]:
+        """
+        Return the checkable argument values, in the same order as
+        ``self.checkers``, with defaults filled in and class references removed.
+        """
+        checkable_args: Dict[str, Any] = self.defaults.copy()
+        checkable_args.update(kwargs)
+
+        if self.skip_reference:
+            args = args[1:]
+        if len(args) > len(self.names):
+            raise_mismatch(len(self.names), len(args))
+        checkable_args.update(zip(self.names, args))
+
+        # Check for mismatch between lengths of arguments/annotations.
+        if len(checkable_args) != len(self.names):
+            raise_mismatch(len(self.names), len(checkable_args))
+        try:
+            values = [checkable_args[name] for name in self.names]
+        except KeyError:
+            raise_mismatch(len(self.names), len(checkable_args))
+
+        return values
+
+
+def raise_mismatch(num_annots: int, num_args: int) -> None:
+    """ Raise an error for mismatched numbers of annotations and arguments. """
+    num_annot_err = f"Mismatch between number of annotated "
+    num_annot_err += f"non-(self / cls / mcs) parameters "
+    num_annot_err += f"'({num_annots})' and number of arguments "
+    num_annot_err += f"'({num_args})'. "
+    num_annot_err += f"Possible causes: wrong number of arguments, or missing "
+    num_annot_err += f"type hint."
+
+    raise TypeError(num_annot_err)
+
+
+def compile_checker(
+    name: str,
+    annotation: Any,
+    ox: Oxentiel,
+    sequence_sampler: Optional[SequenceSampler] = None,
+) -> Checker:
+    """
+    Return a checker for the parameter ``name`` annotated with ``annotation``,
+    which samples the elements of containers with ``sequence_sampler`` if given.
+    The annotation is classified here, for either value of the option
+    ``check-non-asta-types``, rather than on every call.
+    """
+    dispatchers = (
+        resolve_checker(annotation, False),
+        resolve_checker(annotation, True),
+    )
+
+    def _checker(value: Any, equations: Constraints) -> Constraints:
+        """ Check ``value`` against the precompiled annotation. """
+        dispatch = dispatchers[bool(ox.check_non_asta_types)]
+        return dispatch(name, value, annotation, equations, ox)
+
+    if sequence_sampler is None:
+        return _checker
+
+    def _sampled_checker(value: Any, equations: Constraints) -> Constraints:
+        """ Check ``value`` with this parameter's sequence sampler. """
+        token = SEQUENCE_SAMPLER.set(sequence_sampler)
+        try:
+            return _checker(value, equations)
+        finally:
+            SEQUENCE_SAMPLER.reset(token)
+
+    return _sampled_checker
+
+
+def compile_plan(  # type: ignore[no-untyped-def]
+    decorated, ox: Oxentiel, samplers: Optional[Dict[str, SequenceSampler]] = None
+) -> CheckPlan:
+    """
+    Compute the check plan for a function annotated with asta types, where
+    ``samplers`` holds sequence samplers for particular parameters.
+    """
+    samplers = samplers or {}
+    annotations: Dict[str, Any] = decorated.__annotations__
+    names = tuple(name for name in annotations if name != "return")
+
+    # Get the parameter list from the function signature.
+    sig = inspect.signature(decorated)
+    paramlist = list(sig.parameters)
+
+    # Get a dict of the defaults of all parameters which have them.
+    defaults: Dict[str, Any] = {}
+    for k, v in sig.parameters.items():
+        if v.default is not inspect.Parameter.empty:
+            defaults[k] = v.default
+
+    # Determine if there is an unannotated instance/class/metaclass reference.
+    skip_reference = len(paramlist) == len(names) + 1 and paramlist[0] in REFS
+
+    checkers = tuple(
+        compile_checker(name, annotations[name], ox, samplers.get(name))
+        for name in names
+    )
+    header = get_header(decorated)
+    return_checker: Optional[Checker] = None
+    return_wrapper: Optional[ReturnWrapper] = None
+    if "return" in annotations:
+        return_checker = compile_checker(
+            "return", annotations["return"], ox, samplers.get("return")
+        )
+        return_wrapper = compile_return_wrapper(
+            annotations["return"], header, ox, samplers.get("return")
+        )
+
+    # Memoize passed checks only if every argument has a signature.
+    signers: Optional[Tuple[Signer, ...]] = None
+    return_signer: Optional[Signer] = None
+    cache: Optional[SignatureCache] = None
+    if ox.cache_signatures:
+        maybe_signers = [compile_signer(annotations[name]) for name in names]
+        if all(signer is not None for signer in maybe_signers):
+            signers = tuple(maybe_signers)  # type: ignore[arg-type]
+            if "return" in annotations:
+                return_signer = compile_signer(annotations["return"])
+            size = parse_number(ox.signature_cache_size, int)
+            if not isinstance(size, int) or size < 1:
+                raise ValueError(
+                    f"Option 'signature-cache-size' must be a positive int: {size}"
+                )
+            cache = SignatureCache(size)
+
+    return CheckPlan(
+        header=header,
+        names=names,
+        skip_reference=skip_reference,
+        defaults=defaults,
+        checkers=checkers,
+        return_checker=return_checker,
+        signers=signers,
+        return_signer=return_signer,
+        cache=cache,
+        sampler=get_sampler(ox),
+        return_wrapper=return_wrapper,
+    )
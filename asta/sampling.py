@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Policies for typechecking only a sample of the calls to a function, or of the
+elements of a container.
+"""
+import os
+import time
+import random
+import itertools
+import collections
+from typing import Any, Dict, Tuple, Iterable, Iterator, Optional, Container
+from contextvars import ContextVar
+
+from oxentiel import Oxentiel
+
+from asta.config import parse_number
+
+# Maps sampling options to the environment variables which override them, and
+# the types of their values.
+SAMPLING_ENV_VARS = {
+    "sample_first": ("ASTA_SAMPLE_FIRST", int),
+    "sample_every": ("ASTA_SAMPLE_EVERY", int),
+    "sample_rate": ("ASTA_SAMPLE_RATE", float),
+}
+
+
+class Sampler:
+    """
+    Decides which calls to a single decorated function get checked. The first
+    ``first`` calls are always checked. After that, only every ``every``-th
+    call is considered, and each of those is checked with probability ``rate``.
+
+    Parameters
+    ----------
+    first : ``int``.
+        The number of initial calls which are always checked.
+    every : ``int``.
+        Check one in every ``every`` of the remaining calls.
+    rate : ``float``.
+        The probability that a call which wasn't skipped by ``every`` is checked.
+    """
+
+    __slots__ = ("first", "every", "rate", "calls", "rng")
+
+    def __init__(self, first: int, every: int, rate: float) -> None:
+        self.first = first
+        self.every = every
+        self.rate = rate
+        self.calls = 0
+        self.rng = random.Random()
+
+    def sample(self) -> bool:
+        """ Count a call, and return whether or not it should be checked. """
+        calls = self.calls
+        self.calls = calls + 1
+        if calls < self.first:
+            return True
+        if self.every > 1 and (calls - self.first) % self.every:
+            return False
+        return self.rate >= 1.0 or self.rng.random() < self.rate
+
+
+def get_option(ox: Oxentiel, name: str) -> Any:
+    """ Get a sampling option, preferring its environment variable if set. """
+    env_var, numeric_type = SAMPLING_ENV_VARS[name]
+    if env_var in os.environ:
+        return parse_number(os.environ[env_var], numeric_type)
+    return parse_number(getattr(ox, name), numeric_type)
+
+
+def get_sampler(ox: Oxentiel) -> Optional[Sampler]:
+    """
+    Return a fresh sampler for a decorated function according to the
+    configured policy, or ``None`` if every call should be checked.
+    """
+    first = get_option(ox, "sample_first")
+    every = get_option(ox, "sample_every")
+    rate = get_option(ox, "sample_rate")
+    if not isinstance(first, int) or first < 0:
+        raise ValueError(f"Option 'sample-first' must be a nonnegative int: {first}")
+    if not isinstance(every, int) or every < 1:
+        raise ValueError(f"Option 'sample-every' must be a positive int: {every}")
+    if not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+        raise ValueError(f"Option 'sample-rate' must be in [0, 1]: {rate}")
+    if every == 1 and rate >= 1:
+        return None
+    return Sampler(first, every, float(rate))
+
+
+# Strategies for choosing which elements of a container get checked.
+SEQUENCE_STRATEGIES = ("all", "first", "last", "strided", "random", "time")
+
+
+class SequenceSampler:
+    """
+    Decides which elements of containers like ``List[*]``, ``Set[*]`` and
+    ``Dict[*]`` get checked.
+
+    Parameters
+    ----------
+    strategy : ``str``.
+        One of ``SEQUENCE_STRATEGIES``. ``all`` checks every element, ``first``
+        and ``last`` check the first or last ``size``, ``strided`` checks at
+        most ``size`` evenly spaced elements, ``random`` checks ``size`` chosen
+        at random, and ``time`` checks elements until ``budget`` runs out.
+    size : ``int``.
+        The number of elements to check, for all but ``all`` and ``time``.
+    budget : ``float``.
+        The number of seconds to spend on each container, for ``time``. The
+        deadline is checked before each element is yielded, so it covers the
+        checks of the elements before it, as long as they're checked as
+        they're selected. The first element is always checked.
+    seed : ``int``.
+        The seed of the random number generator used by ``random``.
+    """
+
+    __slots__ = ("strategy", "size", "budget", "rng")
+
+    def __init__(
+        self, strategy: str, size: int = 1, budget: float = 0.0, seed: int = 0
+    ) -> None:
+        self.strategy = strategy
+        self.size = size
+        self.budget = budget
+        self.rng = random.Random(seed)
+
+    def select(self, values: Iterable) -> Iterable[Tuple[int, Any]]:
+        """
+        Return the elements of ``values`` which should be checked, along with
+        their indices, in order of index. ``values`` must be sized for
+        ``last``, ``strided`` and ``random``.
+        """
+        strategy = self.strategy
+        if strategy == "all":
+            return enumerate(values)
+        if strategy == "first":
+            return itertools.islice(enumerate(values), self.size)
+        if strategy == "time":
+            return self.budgeted(values)
+
+        indices = self.indices(len(values))  # type: ignore[arg-type]
+        if isinstance(values, collections.abc.Sequence):
+            return ((i, values[i]) for i in indices)
+        selected = set(indices)
+        return ((i, v) for i, v in enumerate(values) if i in selected)
+
+    def indices(self, length: int) -> Iterable[int]:
+        """
+        Return the indices to check of ``length`` elements, in order, for
+        ``last``, ``strided`` and ``random``.
+        """
+        if self.strategy == "last":
+            return range(max(0, length - self.size), length)
+        if self.strategy == "strided":
+            return range(0, length, max(1, -(-length // self.size)))
+        return sorted(self.rng.sample(range(length), min(self.size, length)))
+
+    def budgeted(self, values: Iterable) -> Iterator[Tuple[int, Any]]:
+        """ Yield elements of ``values`` until the time budget runs out. """
+        deadline = time.perf_counter() + self.budget
+        for i, v in enumerate(values):
+            if i and time.perf_counter() > deadline:
+                return
+            yield i, v
+
+
+class StreamSampler:
+    """
+    Decides which items of a single iterator get checked, as they're produced,
+    following the strategy of a ``SequenceSampler``. ``last``, ``strided`` and
+    ``random`` need to know the number of items in advance, so streams without
+    a length hint have their first ``size`` items checked instead. For ``time``,
+    the budget covers the time spent checking the items of the stream, and
+    callers add to ``spent`` as they check them.
+
+    Parameters
+    ----------
+    sampler : ``SequenceSampler``.
+        The sampler whose strategy is followed.
+    length : ``int``.
+        The number of items in the stream, or ``0`` if it isn't known.
+    """
+
+    __slots__ = ("strategy", "size", "budget", "selected", "spent")
+
+    def __init__(self, sampler: SequenceSampler, length: int) -> None:
+        self.strategy = sampler.strategy
+        self.size = sampler.size
+        self.budget = sampler.budget
+        self.selected: Optional[Container[int]] = None
+        if self.strategy in ("last", "strided", "random") and length > 0:
+            indices = sampler.indices(length)
+            self.selected = indices if isinstance(indices, range) else set(indices)
+        self.spent = 0.0
+
+    def sample(self, index: int) -> bool:
+        """ Return whether or not the item at ``index`` should be checked. """
+        if self.strategy == "all":
+            return True
+        if self.selected is not None:
+            return index in self.selected
+        if self.strategy == "time":
+            return index == 0 or self.spent <= self.budget
+        return index < self.size
+
+
+def parse_sequence_sampling(spec: str, seed: int) -> SequenceSampler:
+    """
+    Parse a sequence sampling strategy like ``all``, ``first:8``, ``random:16``
+    or ``time:0.001``, where the number after the colon is the sample size, or
+    the time budget in seconds for ``time``.
+    """
+    strategy, _, arg = str(spec).partition(":")
+    if strategy not in SEQUENCE_STRATEGIES:
+        raise ValueError(
+            f"Unknown sequence sampling strategy '{strategy}' in '{spec}'. "
+            f"Expected one of: {', '.join(SEQUENCE_STRATEGIES)}."
+        )
+    if strategy == "all":
+        if arg:
+            raise ValueError(f"Sequence sampling strategy 'all' takes no size: {spec}")
+        return SequenceSampler(strategy, seed=seed)
+    if strategy == "time":
+        budget = parse_number(arg, float)
+        if not isinstance(budget, (int, float)) or not budget > 0:
+            raise ValueError(f"Strategy 'time' needs a positive budget: {spec}")
+        return SequenceSampler(strategy, budget=float(budget), seed=seed)
+    size = parse_number(arg, int) if arg else 1
+    if not isinstance(size, int) or size < 1:
+        raise ValueError(f"Sequence sample size must be a positive int: {spec}")
+    return SequenceSampler(strategy, size=size, seed=seed)
+
+
+# The sampler for the parameter being checked, if it overrides the global one.
+SEQUENCE_SAMPLER: ContextVar[Optional[SequenceSampler]] = ContextVar(
+    "SEQUENCE_SAMPLER", default=None
+)
+
+# Global samplers, keyed on the options they were parsed from.
+SEQUENCE_SAMPLERS: Dict[Tuple[Any, ...], SequenceSampler] = {}
+
+
+def get_sequence_sampler(ox: Oxentiel) -> SequenceSampler:
+    """
+    Return the sampler for the parameter being checked, falling back to the one
+    configured by ``sequence-sampling``. The older ``check-all-sequence-elements``
+    option, when ``no``, is equivalent to ``first:1``.
+    """
+    sampler = SEQUENCE_SAMPLER.get()
+    if sampler is not None:
+        return sampler
+    check_all = ox.check_all_sequence_elements
+    seed = parse_number(ox.sequence_sample_seed, int)
+    key = (ox.sequence_sampling, seed, check_all)
+    sampler = SEQUENCE_SAMPLERS.get(key)
+    if sampler is None:
+        spec, seed, _ = key
+        if spec == "all" and not check_all:
+            spec = "first:1"
+        sampler = parse_sequence_sampling(spec, seed)
+        SEQUENCE_SAMPLERS[key] = sampler
+    return sampler
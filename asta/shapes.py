@@ -25,6 +25,9 @@ class Shapes:
         # Set any attributes here - before initialisation (they remain normal attrs).
         self.placeholder_map: Dict[str, Union[Placeholder, Tuple[int, ...]]] = {}
 
+        # Incremented whenever the value of a shape changes.
+        self.generation = 0
+
         # After initialization, setting attributes is the same as setting an item.
         self.__initialized = True
 
@@ -58,7 +61,9 @@ class Shapes:
             for element in value:
                 if not isinstance(element, int):
                     raise TypeError("Shape elements must be integers.")
-            self.placeholder_map[name] = value
+            if self.placeholder_map.get(name) != value:
+                self.placeholder_map[name] = value
+                super().__setattr__("generation", self.generation + 1)
 
 
 sys.modules[__name__] = Shapes()  # type: ignore[assignment]
@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+""" A native solver for the integer dimension equations built during checks. """
+import functools
+from fractions import Fraction
+from typing import Set, Dict, List, Tuple, Union, Iterable, Optional, NamedTuple
+
+from sympy import solvers
+from sympy.core.expr import Expr
+from sympy.core.symbol import Symbol
+from sympy.core.numbers import Number, Rational
+
+# A rational number, kept as an ``int`` when it is integral, which is faster.
+Coefficient = Union[int, Fraction]
+
+# A linear equation ``sum(c * s for s, c in coefficients.items()) + constant = 0``.
+LinearForm = Tuple[Dict[Symbol, Coefficient], Coefficient]
+
+
+@functools.lru_cache(maxsize=4096)
+def linear_form(expr: Expr) -> Optional[LinearForm]:
+    """
+    Decompose ``expr`` into rational coefficients of its symbols and a constant
+    term. Returns ``None`` if ``expr`` is not linear in its symbols.
+    """
+    coefficients: Dict[Symbol, Fraction] = {}
+    constant = Fraction(0)
+    if isinstance(expr, int):
+        return {}, expr
+    for term, coefficient in expr.as_coefficients_dict().items():
+        if not isinstance(coefficient, Rational):
+            return None
+        value = Fraction(int(coefficient.p), int(coefficient.q))
+        if isinstance(term, Number):
+            constant += value * Fraction(int(term.p), int(term.q))
+        elif isinstance(term, Symbol):
+            coefficients[term] = coefficients.get(term, Fraction(0)) + value
+        else:
+            return None
+    integral = {symbol: exact(c) for symbol, c in coefficients.items() if c != 0}
+    return integral, exact(constant)
+
+
+def exact(value: Fraction) -> Coefficient:
+    """ Return ``value`` as an ``int`` if it is one. """
+    return int(value) if value.denominator == 1 else value
+
+
+def divide(numerator: Coefficient, denominator: Coefficient) -> Coefficient:
+    """ Divide exactly, keeping integral quotients of integers as ``int``. """
+    if isinstance(numerator, int) and isinstance(denominator, int):
+        if numerator % denominator == 0:
+            return numerator // denominator
+    return Fraction(numerator, denominator)
+
+
+class AffineForm:
+    """
+    A linear dimension expression like ``2 * X + 1``, compiled so that it can
+    be evaluated with a few integer operations instead of ``expr.subs()``. The
+    equations it makes with concrete sizes are memoized, since the same sizes
+    come up call after call.
+
+    Parameters
+    ----------
+    expression : ``Expr``.
+        The expression.
+    form : ``LinearForm``.
+        Its coefficients and constant term, from ``linear_form()``.
+    """
+
+    __slots__ = ("expression", "coefficients", "symbols", "constant", "equations")
+
+    def __init__(self, expression: Expr, form: LinearForm) -> None:
+        self.expression = expression
+        self.coefficients: Tuple[Tuple[Symbol, Coefficient], ...]
+        self.coefficients = tuple(form[0].items())
+        self.symbols = tuple(form[0])
+        self.constant = form[1]
+        self.equations: Dict[int, Expr] = {}
+
+    def evaluate(self, values: Dict[Symbol, int]) -> Optional[Coefficient]:
+        """ Evaluate with ``values`` for the symbols, or ``None`` if some lack one. """
+        total = self.constant
+        for symbol, coefficient in self.coefficients:
+            value = values.get(symbol)
+            if value is None:
+                return None
+            total += coefficient * value
+        return total
+
+    def equals(self, other: "AffineForm") -> bool:
+        """ Whether ``other`` is the same linear function of the same symbols. """
+        if self.constant != other.constant:
+            return False
+        return dict(self.coefficients) == dict(other.coefficients)
+
+    def equation(self, size: int) -> Expr:
+        """ Return the equation ``expression - size``, which must equal zero. """
+        equation = self.equations.get(size)
+        if equation is None:
+            if len(self.equations) >= EQUATIONS_SIZE:
+                self.equations.clear()
+            equation = self.expression - size
+            self.equations[size] = equation
+        return equation
+
+
+# Maximum number of sizes each ``AffineForm`` memoizes equations for.
+EQUATIONS_SIZE = 256
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_dimension(expression: Expr) -> Optional[AffineForm]:
+    """ Compile ``expression``, or return ``None`` if it isn't linear. """
+    form = linear_form(expression)
+    if form is None:
+        return None
+    return AffineForm(expression, form)
+
+
+def to_rational(value: Coefficient) -> Rational:
+    """ Convert a ``Fraction`` to a sympy ``Rational``. """
+    return Rational(value.numerator, value.denominator)
+
+
+def propagate(
+    forms: List[LinearForm], bindings: Dict[Symbol, int]
+) -> Tuple[bool, List[LinearForm]]:
+    """
+    Repeatedly substitute ``bindings`` into ``forms`` and bind every symbol
+    which is the only unknown left in some equation. Updates ``bindings`` in
+    place, and returns whether the system is still consistent along with the
+    equations which still have at least two unknowns.
+    """
+    progress = True
+    while progress:
+        progress = False
+        remaining: List[LinearForm] = []
+        for coefficients, constant in forms:
+            unknowns: Dict[Symbol, Coefficient] = {}
+            for symbol, coefficient in coefficients.items():
+                if symbol in bindings:
+                    constant += coefficient * bindings[symbol]
+                else:
+                    unknowns[symbol] = coefficient
+
+            # No unknowns left, so the equation must read ``0 = 0``.
+            if not unknowns:
+                if constant != 0:
+                    return False, []
+
+            # Exactly one unknown, so we solve for it.
+            elif len(unknowns) == 1:
+                (symbol, coefficient), = unknowns.items()
+                value = divide(-constant, coefficient)
+
+                # Dimension sizes must be integers.
+                if value.denominator != 1:
+                    return False, []
+                bindings[symbol] = int(value)
+                progress = True
+            else:
+                remaining.append((unknowns, constant))
+        forms = remaining
+
+    return True, forms
+
+
+def eliminate(
+    forms: List[LinearForm], bindings: Dict[Symbol, int]
+) -> Tuple[bool, List[LinearForm]]:
+    """
+    Gauss-Jordan elimination over the rationals for coupled linear equations.
+    Symbols determined uniquely by the reduced system are added to ``bindings``.
+    Returns whether the system is consistent, and the reduced equations which
+    leave more than one symbol free (these have infinitely many solutions).
+    """
+    rows = [(dict(coefficients), constant) for coefficients, constant in forms]
+    pivots: List[Tuple[Symbol, int]] = []
+    for i, _ in enumerate(rows):
+        coefficients, constant = rows[i]
+        if not coefficients:
+            if constant != 0:
+                return False, []
+            continue
+
+        # Normalize the row so the pivot symbol has coefficient one.
+        pivot = next(iter(coefficients))
+        scale = coefficients[pivot]
+        coefficients = {
+            symbol: divide(c, scale) for symbol, c in coefficients.items()
+        }
+        rows[i] = (coefficients, divide(constant, scale))
+        pivots.append((pivot, i))
+
+        # Eliminate the pivot symbol from every other row.
+        for j, (other, other_constant) in enumerate(rows):
+            factor = other.get(pivot, 0)
+            if j == i or factor == 0:
+                continue
+            reduced = dict(other)
+            for symbol, coefficient in coefficients.items():
+                reduced[symbol] = reduced.get(symbol, 0) - factor * coefficient
+            reduced = {symbol: c for symbol, c in reduced.items() if c != 0}
+            rows[j] = (reduced, other_constant - factor * rows[i][1])
+
+    underdetermined: List[LinearForm] = []
+    for coefficients, constant in rows:
+        if not coefficients and constant != 0:
+            return False, []
+    for pivot, i in pivots:
+        coefficients, constant = rows[i]
+        if len(coefficients) == 1:
+            value = divide(-constant, coefficients[pivot])
+            if value.denominator != 1:
+                return False, []
+            bindings[pivot] = int(value)
+        elif coefficients:
+            underdetermined.append((coefficients, constant))
+
+    return True, underdetermined
+
+
+class Partial(NamedTuple):
+    """
+    The linear part of a solved system, which later equations can be added to
+    without solving the whole system again.
+    """
+
+    symbols: Set[Symbol]
+    bindings: Dict[Symbol, int]
+    forms: List[LinearForm]
+
+
+def reduce(
+    equations: Iterable[Expr], partial: Optional[Partial] = None
+) -> Tuple[bool, Partial, List[Expr]]:
+    """
+    Solve the linear equations in ``equations``, along with those already
+    reduced to ``partial``, which is left unchanged. Returns whether they are
+    consistent, the new partial solution, and the nonlinear equations.
+    """
+    symbols: Set[Symbol] = set()
+    forms: List[LinearForm] = []
+    nonlinear: List[Expr] = []
+    bindings: Dict[Symbol, int] = {}
+    if partial is not None:
+        symbols.update(partial.symbols)
+        forms.extend(partial.forms)
+        bindings.update(partial.bindings)
+    for equation in equations:
+        form = linear_form(equation)
+        if form is None:
+            nonlinear.append(equation)
+            symbols.update(equation.free_symbols)
+        else:
+            forms.append(form)
+            symbols.update(form[0])
+
+    consistent, forms = propagate(forms, bindings)
+    if consistent and forms:
+        consistent, forms = eliminate(forms, bindings)
+    return consistent, Partial(symbols, bindings, forms), nonlinear
+
+
+def solve(
+    equations: Iterable[Expr], partial: Optional[Partial] = None
+) -> Tuple[bool, Set[Symbol], List[Dict[Symbol, int]]]:
+    """
+    Solve ``equations`` for integer dimension sizes, given the partial solution
+    of any equations solved before. Linear equations are handled natively, and
+    sympy is only consulted for nonlinear equations which are still
+    undetermined after substituting everything the linear part binds.
+    """
+    consistent, partial, nonlinear = reduce(equations, partial)
+    return complete(consistent, partial, nonlinear)
+
+
+def complete(
+    consistent: bool, partial: Partial, nonlinear: List[Expr]
+) -> Tuple[bool, Set[Symbol], List[Dict[Symbol, int]]]:
+    """ Solve the ``nonlinear`` equations left over by ``reduce()``. """
+    symbols, bindings, forms = partial
+    if not consistent:
+        return False, symbols, []
+
+    # Substitute what we know into the nonlinear equations.
+    if not nonlinear:
+        return True, symbols, [bindings]
+    remaining: List[Expr] = []
+    for equation in nonlinear:
+        substituted = equation.subs(bindings) if bindings else equation
+        if isinstance(substituted, Number):
+            if substituted != 0:
+                return False, symbols, []
+        else:
+            remaining.append(substituted)
+    if not remaining:
+        return True, symbols, [bindings]
+
+    # Fall back to sympy for what's left.
+    for coefficients, constant in forms:
+        terms = [to_rational(c) * symbol for symbol, c in coefficients.items()]
+        remaining.append(sum(terms) + to_rational(constant))
+    unknowns: Set[Symbol] = set()
+    for equation in remaining:
+        unknowns.update(equation.free_symbols)
+    solutions = solvers.solve(remaining, unknowns, dict=True)
+
+    # Discard solutions with sizes which are definitely not integers.
+    solutions = [
+        {**bindings, **solution}
+        for solution in solutions
+        if all(value.is_integer is not False for value in solution.values())
+    ]
+    return len(solutions) >= 1, symbols, solutions
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """ Functions for checking type annotations and their origin types. """
-from typing import Any, Set, List, Tuple, Union
+from typing import Any, Set, Dict, List, Tuple, Union
 
 from oxentiel import Oxentiel
 from sympy.core.expr import Expr
@@ -10,6 +10,7 @@ from sympy.core.numbers import Number, Integer
 
 import asta.dims
 import asta.shapes
+from asta.solver import compile_dimension
 from asta.display import fail_uninitialized, fail_numerical_expression
 from asta.constants import ALL_DIM_TYPES
 from asta.placeholder import Placeholder
@@ -35,19 +36,28 @@ def substitute(
     dimension_sizes: List[Any] = []
     uninitialized_names: Set[str] = set()
     initialized = True
+    scoped: Dict[Symbol, int] = asta.dims.scope_var.get().values
 
     for i, item in enumerate(shape):
 
         # Case 1: ``item`` is a sympy type.
         if isinstance(item, (Symbol, Expr)):
             expression = item
+            values: Dict[Symbol, int] = {}
 
-            # Use sympy to get a set of symbols used in expression.
-            for symbol in item.free_symbols:
+            # Linear expressions are compiled once, and evaluated without sympy.
+            form = compile_dimension(item)
+            symbols = item.free_symbols if form is None else form.symbols
+
+            for symbol in symbols:
+
+                # Values bound by ``asta.dims.scope()`` come first.
+                if symbol in scoped:
+                    values[symbol] = scoped[symbol]
 
                 # Check if any of the symbols in our list are in
                 # ``asta.dims.symbol_map``.
-                if symbol in asta.dims.symbol_map:
+                elif symbol in asta.dims.symbol_map:
                     value = asta.dims.symbol_map[symbol]
 
                     # Out of those that are, we check if any have ``None``
@@ -62,8 +72,16 @@ def substitute(
                             fail_uninitialized(name, ox)
                         uninitialized_names.add(name)
                     else:
-                        # Otherwise, we substitute in their values with sympy.
-                        expression = expression.subs(symbol, value)
+                        # Otherwise, we substitute in their values.
+                        values[symbol] = value
+
+            size = form.evaluate(values) if form is not None and values else None
+            if size is not None and not isinstance(size, int):
+                size = int(size) if size.denominator == 1 else None
+            if size is not None:
+                expression = size
+            elif values:
+                expression = expression.subs(values)
 
             # If this is a number (contains no symbols), it ought to be an integer.
             if isinstance(expression, Number):
@@ -1,11 +1,16 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-""" A switchboard for importing asta modules with large dependencies. """
+"""
+A switchboard for importing asta modules with large dependencies. Backends are
+never imported here; if one has already been imported, its real class is
+exported, otherwise a stand-in which wires the backend up on demand.
+"""
 # pylint: disable=unused-import, reimported, invalid-name
+from asta.backends import get_wired
 from asta.unusable import Tensor, TFTensor
-from asta.constants import _TORCH_IMPORTED, _TENSORFLOW_IMPORTED
 
-if _TORCH_IMPORTED:
-    from asta.tensor import Tensor
-if _TENSORFLOW_IMPORTED:
-    from asta.tftensor import TFTensor
+WIRED = get_wired()
+if "torch" in WIRED:
+    Tensor = WIRED["torch"]  # type: ignore[misc]
+if "tensorflow" in WIRED:
+    TFTensor = WIRED["tensorflow"]  # type: ignore[misc]
@@ -10,11 +10,15 @@ import hypothesis.strategies as st
 import hypothesis.extra.numpy as hnp
 from hypothesis import given, assume
 
-from asta import Array, Scalar
+from asta import Array, Scalar, symbols
+from asta.classes import SUBSCRIPTIONS
+from asta.display import type_representation
 from asta.tests import strategies as strats
-from asta.utils import rand_split_shape
+from asta.utils import astasolver, shapecheck, rand_split_shape
 
-# pylint: disable=no-value-for-parameter
+# pylint: disable=no-value-for-parameter, invalid-name
+
+X = symbols.X
 
 
 def test_array_is_reflexive() -> None:
@@ -37,6 +41,28 @@ def test_array_is_reflexive() -> None:
     assert Array[int, (1, 2, 3)] != Array[int, (1, 2, 4)]
 
 
+def test_array_subscriptions_are_interned() -> None:
+    """ Make sure identical subscriptions return the same class object. """
+    assert Array[int] is Array[int]
+    assert Array[float, 3, 4] is Array[float, 3, 4]
+    assert Array[float, 3, 4] is Array[float, (3, 4)]
+    assert Array[float, 3, 4] is Array[np.dtype("float64"), 3, 4]
+    assert Array[float, 3, 4] is not Array[float, 3, 5]
+    assert Array[float, 3, 4] is not Array[int, 3, 4]
+    assert Array[int][3] is Array[int][3]
+    assert hash(Array[int]) == hash(Array[int])
+
+
+def test_type_representation_matches_subscription() -> None:
+    """ Values are described like the matching subscription, without creating it. """
+    arr = np.zeros((2, 3), dtype=np.int32)
+    num_subscriptions = len(SUBSCRIPTIONS)
+    rep = type_representation(arr)
+    assert len(SUBSCRIPTIONS) == num_subscriptions
+    assert rep == repr(Array[np.int32, 2, 3]).replace("asta", "numpy")
+    assert type_representation(3) == repr(int)
+
+
 def test_array_fails_instantiation() -> None:
     """ ``Array()`` should raise a TypeError. """
     with pytest.raises(TypeError):
@@ -136,6 +162,26 @@ def test_array_ellipsis_passes_for_empty_subshapes() -> None:
     assert isinstance(arr, Array[..., 2, ...])
 
 
+def test_array_ellipsis_backtracks() -> None:
+    """ Fragments between ellipses aren't just matched at their first occurrence. """
+    arr = np.zeros((2, 2, 3, 2))
+    assert isinstance(arr, Array[..., 2])
+    assert isinstance(arr, Array[..., 2, ..., 2])
+    assert isinstance(arr, Array[2, ..., 2, 3, ..., 2])
+    assert not isinstance(arr, Array[..., 3, ..., 3, ...])
+    assert not isinstance(np.zeros((2, 0, 3)), Array[..., 3, ...])
+    assert isinstance(np.zeros((2, 0, 3)), Array[..., 0, ...])
+
+
+def test_array_ellipsis_with_symbols() -> None:
+    """ Symbolic fragments are placed where their equations have a solution. """
+    arr = np.zeros((2, 3, 7, 3, 7))
+    assert isinstance(arr, Array[..., X, 3, ..., X])
+    assert not isinstance(arr, Array[..., X, 3, ..., X + 1])
+    _, equations = shapecheck(arr.shape, (..., X, 3, ..., X))
+    assert astasolver(equations)[2] == [{X: 7}]
+
+
 @given(st.lists(elements=st.just(Scalar), min_size=2))
 def test_array_raises_on_multiple_scalar_objects(scalar_list: List[Scalar]) -> None:
     """ ``Array[Scalar,...]`` should raise a TypeError. """
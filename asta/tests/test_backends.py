@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+""" Tests for lazy wiring of the torch and tensorflow backends. """
+import sys
+import subprocess
+
+from asta.unusable import Tensor, TFTensor
+
+# pylint: disable=no-value-for-parameter
+
+
+def test_import_does_not_import_backends() -> None:
+    """ Importing asta in a fresh process shouldn't import torch or tensorflow. """
+    code = "import sys, asta; "
+    code += "assert 'torch' not in sys.modules; "
+    code += "assert 'tensorflow' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_stand_ins_without_backends() -> None:
+    """ Nothing is an instance of a stand-in whose backend isn't imported. """
+    if "torch" not in sys.modules:
+        assert not isinstance(1, Tensor)
+        assert repr(Tensor) == "<asta.Tensor>"
+    if "tensorflow" not in sys.modules:
+        assert not isinstance(1, TFTensor)
+        assert repr(TFTensor) == "<asta.TFTensor>"
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+""" Tests for memoization of passed checks. """
+import sys
+from typing import Dict, List, Tuple, Union, Callable, Optional
+
+import pytest
+import numpy as np
+
+from asta import Array, dims, typechecked
+from asta.cache import SignatureCache, compile_signer, leaf_signature
+from asta.config import get_ox
+
+# pylint: disable=no-value-for-parameter, invalid-name
+
+N = dims.CACHE_N
+
+
+def test_compile_signer() -> None:
+    """ Only annotations determined by types, dtypes and shapes have signers. """
+    assert compile_signer(Array[float, 8]) is leaf_signature
+    assert compile_signer(Optional[Array[float, 8]]) is leaf_signature
+    assert compile_signer(Callable[[int], int]) is None
+    assert compile_signer(List[Array[float, 8]]) is not None
+    assert compile_signer(Dict[str, Array[int]]) is not None
+    assert compile_signer(Tuple[int, Array[float]]) is not None
+    assert compile_signer(List[Callable[[int], int]]) is None
+
+    signer = compile_signer(List[Array[float, 8]])
+    value = [np.zeros((8,)), np.zeros((8,))]
+    assert signer(value) == signer([np.ones((8,)), np.ones((8,))])
+    assert signer(value) != signer([np.zeros((8,))])
+    assert signer(value) != signer([np.zeros((8,), dtype=int)] * 2)
+
+
+def test_signature_cache_evicts_least_recently_used() -> None:
+    """ The cache holds at most ``maxsize`` entries. """
+    cache = SignatureCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_cached_checks() -> None:
+    """ Cached calls still fail when shapes or dims change. """
+    ox = get_ox()
+    ox.cache_signatures = True
+    ox.print_passes = False
+    try:
+
+        @typechecked
+        def scale(x: Array[float, N], y: Array[float, N]) -> Array[float, N]:
+            """ Scale ``x`` by ``y``. """
+            return x * y
+
+        dims.CACHE_N = 4
+        x = np.ones((4,))
+        scale(x, x)
+        scale(x, x)
+        with pytest.raises(TypeError):
+            scale(x, np.ones((5,)))
+
+        # Changing a dim invalidates what was cached under its old value.
+        dims.CACHE_N = 5
+        with pytest.raises(TypeError):
+            scale(x, x)
+    finally:
+        ox.cache_signatures = False
+        ox.print_passes = True
+
+
+def test_cached_checks_print_passes(capsys) -> None:
+    """ Calls are checked, and their passes printed, if passes are printed. """
+    ox = get_ox()
+    ox.cache_signatures = True
+    try:
+
+        @typechecked
+        def double(x: Array[float, 3]) -> Array[float, 3]:
+            """ Double ``x``. """
+            return 2 * x
+
+        x = np.ones((3,))
+        double(x)
+        capsys.readouterr()
+        double(x)
+        out = capsys.readouterr().out
+        assert "'x'" in out and "'return'" in out
+    finally:
+        ox.cache_signatures = False
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="requires typing.Protocol")
+def test_type_checks_cache() -> None:
+    """ Protocol and fallback checks are remembered per type of value. """
+    from typing import Protocol, runtime_checkable
+
+    from asta.origins import TYPE_CHECKS, check_annotation
+
+    @runtime_checkable
+    class Sized(Protocol):
+        """ Has a length. """
+
+        def __len__(self) -> int:
+            ...
+
+    class Spoofed:
+        """ Claims to be a ``str``. """
+
+        __class__ = str
+
+    ox = get_ox()
+    ox.check_non_asta_types = True
+    try:
+        check_annotation("x", [1], Sized, set(), ox)
+        assert TYPE_CHECKS[(list, Sized, True)] is True
+        with pytest.raises(TypeError):
+            check_annotation("x", 1, Sized, set(), ox)
+        assert TYPE_CHECKS[(int, Sized, True)] is False
+
+        check_annotation("x", "a", str, set(), ox)
+        assert TYPE_CHECKS[(str, str, False)] is True
+        check_annotation("x", Spoofed(), str, set(), ox)
+        assert (Spoofed, str, False) not in TYPE_CHECKS
+        with pytest.raises(TypeError):
+            check_annotation("x", 1, str, set(), ox)
+    finally:
+        ox.check_non_asta_types = False
+
+
+def test_union_sites_are_bounded(monkeypatch) -> None:
+    """ Union call sites are forgotten once there are too many of them. """
+    from asta import origins
+
+    monkeypatch.setattr(origins, "CACHE_SIZE", 2)
+    monkeypatch.setattr(origins, "UNION_SITES", {})
+    ox = get_ox()
+    for i in range(5):
+        annotation = Union[Array[float, i + 1], Array[int, i + 1]]
+        origins.check_annotation(f"x{i}", np.zeros((i + 1,)), annotation, set(), ox)
+        assert len(origins.UNION_SITES) <= 2
+
+
+def test_dispatch_is_bounded(monkeypatch) -> None:
+    """ Checkers are forgotten once too many annotations have been checked. """
+    from asta import origins
+
+    monkeypatch.setattr(origins, "CACHE_SIZE", 2)
+    monkeypatch.setattr(origins, "DISPATCH", {})
+    ox = get_ox()
+    for i in range(5):
+        origins.check_annotation("x", np.zeros((i,)), Array[float, i], set(), ox)
+        assert len(origins.DISPATCH) <= 2
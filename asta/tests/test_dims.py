@@ -2,9 +2,15 @@
 # -*- coding: utf-8 -*-
 # type: ignore
 """ Tests for valid dims attributes. """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+import numpy as np
 
-from asta import dims
+from asta import Array, dims, origins, symbols
+from asta.config import get_ox
+from asta.substitution import substitute
 
 # pylint: disable=no-value-for-parameter, invalid-name
 
@@ -13,3 +19,136 @@ def test_dims_rejects_tuple_attributes() -> None:
     """ Make sure sympy dims and expressions work as intended. """
     with pytest.raises(TypeError):
         dims.X = (1,)
+
+
+def test_dims_generation() -> None:
+    """ The generation only changes when the value of a dim does. """
+    dims.GENERATION_X = 1
+    generation = dims.generation
+    dims.GENERATION_X = 1
+    assert dims.generation == generation
+    dims.GENERATION_X = 2
+    assert dims.generation == generation + 1
+
+
+def test_refresh_is_cached_per_generation(monkeypatch) -> None:
+    """ Annotations are only substituted again after a dim changes. """
+    calls = []
+
+    def counting_substitute(shape, ox):
+        calls.append(shape)
+        return substitute(shape, ox)
+
+    monkeypatch.setattr(origins, "substitute", counting_substitute)
+    annotation = Array[float, dims.REFRESH_X, 2 * dims.REFRESH_X]
+    dims.REFRESH_X = 3
+    ox = get_ox()
+    assert origins.refresh(annotation, ox)[0] == Array[float, 3, 6]
+    assert origins.refresh(annotation, ox)[0] == Array[float, 3, 6]
+    assert len(calls) == 1
+    dims.REFRESH_X = 4
+    assert origins.refresh(annotation, ox)[0] == Array[float, 4, 8]
+    assert len(calls) == 2
+
+
+def test_refreshed_is_bounded(monkeypatch) -> None:
+    """ Refreshed annotations are forgotten once there are too many of them. """
+    monkeypatch.setattr(origins, "CACHE_SIZE", 4)
+    monkeypatch.setattr(origins, "REFRESHED", {})
+    annotation = Array[float, dims.BOUNDED_X]
+    ox = get_ox()
+    for size in range(10):
+        with dims.scope(BOUNDED_X=size):
+            assert origins.refresh(annotation, ox)[0] == Array[float, size]
+        assert len(origins.REFRESHED) <= 4
+
+
+def test_dims_scope() -> None:
+    """ Scoped values override global ones, nest, and are per context. """
+    dims.SCOPE_X = 2
+    annotation = Array[float, dims.SCOPE_Y, 2]
+    arr = np.zeros((3, 2))
+    ox = get_ox()
+    with dims.scope(SCOPE_X=3, SCOPE_Y=3):
+        assert dims.SCOPE_X == 3
+        assert isinstance(arr, origins.refresh(annotation, ox)[0])
+        with dims.scope(SCOPE_X=4):
+            assert dims.SCOPE_X == 4
+            assert dims.SCOPE_Y == 3
+        assert dims.SCOPE_X == 3
+    assert dims.SCOPE_X == 2
+
+    # Other threads don't see the values bound in this one.
+    with dims.scope(SCOPE_X=5):
+        with ThreadPoolExecutor(1) as executor:
+            assert executor.submit(lambda: dims.SCOPE_X).result() == 2
+
+    with pytest.raises(TypeError):
+        with dims.scope(SCOPE_X=(1,)):
+            pass
+
+
+def test_dims_scope_decorator() -> None:
+    """ Decorated functions, async ones included, run with the scoped values. """
+    dims.DECORATED_X = 2
+
+    @dims.scope(DECORATED_X=3)
+    def read() -> int:
+        """ Return the scoped value. """
+        return dims.DECORATED_X
+
+    @dims.scope(DECORATED_X=4)
+    async def read_later() -> int:
+        """ Return the scoped value after being suspended. """
+        await asyncio.sleep(0)
+        return dims.DECORATED_X
+
+    async def read_both() -> list:
+        """ Run two scoped coroutines concurrently. """
+        return await asyncio.gather(read_later(), read_later())
+
+    assert read() == 3
+    assert asyncio.run(read_later()) == 4
+    assert asyncio.run(read_both()) == [4, 4]
+    assert dims.DECORATED_X == 2
+
+
+def test_dims_shared_scope_overlapping_tasks() -> None:
+    """ One scope object can be entered by overlapping tasks, exiting in any order. """
+    dims.SHARED_X = 2
+    shared = dims.scope(SHARED_X=5)
+
+    async def enter(entered: asyncio.Event, release: asyncio.Event) -> int:
+        """ Enter the shared scope, and wait to be released before exiting. """
+        with shared:
+            entered.set()
+            await release.wait()
+            value = dims.SHARED_X
+        return value
+
+    async def overlap() -> list:
+        """ Enter in the order first, second, and exit in the same order. """
+        events = [asyncio.Event() for _ in range(4)]
+        first = asyncio.ensure_future(enter(events[0], events[1]))
+        second = asyncio.ensure_future(enter(events[2], events[3]))
+        await events[0].wait()
+        await events[2].wait()
+        events[1].set()
+        first_value = await first
+        assert not second.done()
+        events[3].set()
+        return [first_value, await second, dims.SHARED_X]
+
+    assert asyncio.run(overlap()) == [5, 5, 2]
+    assert dims.SHARED_X == 2
+
+
+def test_substitute_evaluates_expressions() -> None:
+    """ Expressions of dims are evaluated, and only partly if some are free. """
+    D = dims.SUBSTITUTE_X
+    Y = symbols.Y
+    shape = (D / 2 + 1, Y + 1, D + Y)
+    dims.SUBSTITUTE_X = 4
+    sizes, _, _ = substitute(shape, get_ox())
+    assert sizes == [3, Y + 1, Y + 4]
+    assert isinstance(sizes[0], int)
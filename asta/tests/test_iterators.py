@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+""" Tests for lazily checking the items of returned iterators. """
+import asyncio
+from typing import List, Iterable, Iterator, Generator, AsyncIterator
+
+import pytest
+import numpy as np
+
+from asta import Array, symbols, typechecked
+from asta.config import get_ox
+from asta.iterators import CheckedIterable, CheckedIterator, CheckedGenerator
+
+X = symbols.X
+
+# pylint: disable=no-value-for-parameter, invalid-name
+
+
+@typechecked
+def rows(n: int) -> Iterator[Array[float, 3]]:
+    """ Yield ``n`` rows, the last of which has the wrong shape. """
+    for _ in range(n - 1):
+        yield np.zeros((3,))
+    yield np.zeros((4,))
+
+
+@typechecked
+def batches(x: Array[float, X], sizes: List[int]) -> Iterator[Array[float, X]]:
+    """ Yield arrays with the given sizes. """
+    for size in sizes:
+        yield np.zeros((size,))
+
+
+@typechecked
+def countdown(n: int) -> Generator[Array[float, 2], int, Array[float, 3]]:
+    """ Yield arrays until ``n`` reaches zero, then return one of size ``3 + n``. """
+    while n > 0:
+        n -= yield np.zeros((2,))
+    return np.zeros((3 + n,))
+
+
+def test_iterator_items_checked_lazily() -> None:
+    """ Items are checked one at a time, as they are produced. """
+    it = rows(3)
+    assert isinstance(it, CheckedIterator)
+    next(it)
+    next(it)
+    with pytest.raises(TypeError):
+        next(it)
+
+
+def test_iterator_shares_argument_dims() -> None:
+    """ Items are checked together with the arguments of the call. """
+    assert len(list(batches(np.zeros((2,)), [2, 2]))) == 2
+    it = batches(np.zeros((2,)), [2, 5])
+    next(it)
+    with pytest.raises(TypeError):
+        next(it)
+
+
+def test_share_iterator_dims() -> None:
+    """ With ``share-iterator-dims``, symbols bound by one item bind the rest. """
+
+    @typechecked
+    def sized(sizes: List[int]) -> Iterator[Array[float, X]]:
+        """ Yield arrays with the given sizes. """
+        for size in sizes:
+            yield np.zeros((size,))
+
+    assert len(list(sized([2, 3]))) == 2
+    ox = get_ox()
+    ox.share_iterator_dims = True
+    try:
+        with pytest.raises(TypeError):
+            list(sized([2, 3]))
+    finally:
+        ox.share_iterator_dims = False
+
+
+def test_generator_send_and_return() -> None:
+    """ Generators still accept ``send()``, and their return value is checked. """
+    gen = countdown(3)
+    assert isinstance(gen, CheckedGenerator)
+    next(gen)
+    with pytest.raises(StopIteration):
+        gen.send(3)
+
+    gen = countdown(1)
+    next(gen)
+    with pytest.raises(TypeError):
+        gen.send(2)
+
+
+def test_materialized_iterables() -> None:
+    """ Collections annotated as iterables are checked eagerly, not wrapped. """
+
+    @typechecked
+    def materialized(n: int) -> Iterable[Array[float, 3]]:
+        """ Return a list of ``n`` arrays. """
+        return [np.zeros((3,))] * n + [np.zeros((4,))]
+
+    with pytest.raises(TypeError):
+        materialized(1)
+
+
+class Loader:
+    """ An iterable which is neither a collection nor an iterator. """
+
+    def __init__(self, sizes: List[int]) -> None:
+        self.sizes = sizes
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return (np.zeros((size,)) for size in self.sizes)
+
+
+class SizedLoader(Loader):
+    """ A loader which knows how many items it produces. """
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+
+def test_returned_iterables_checked_lazily() -> None:
+    """ Iterables like data loaders are wrapped, and every pass is checked. """
+
+    @typechecked
+    def load(sizes: List[int]) -> Iterable[Array[float, 3]]:
+        """ Return a loader of arrays with the given sizes. """
+        return Loader(sizes)
+
+    loader = load([3, 3])
+    assert isinstance(loader, CheckedIterable)
+    assert loader.sizes == [3, 3]
+    assert len(list(loader)) == 2
+    assert len(list(loader)) == 2
+
+    loader = load([3, 4])
+    it = iter(loader)
+    next(it)
+    with pytest.raises(TypeError):
+        next(it)
+
+
+def test_argument_iterables_not_checked() -> None:
+    """ Arguments which aren't collections only have their type checked. """
+
+    @typechecked
+    def count(loader: Iterable[Array[float, 3]]) -> int:
+        """ Count the items of ``loader``. """
+        return sum(1 for _ in loader)
+
+    assert count(Loader([3, 4])) == 2
+    with pytest.raises(TypeError):
+        count([np.zeros((3,)), np.zeros((4,))])
+
+
+def test_async_iterators() -> None:
+    """ Async iterators are checked item by item too. """
+
+    @typechecked
+    async def arows(n: int) -> AsyncIterator[Array[float, 3]]:
+        """ Asynchronously yield ``n`` rows, the last of which is wrong. """
+        for _ in range(n - 1):
+            yield np.zeros((3,))
+        yield np.zeros((4,))
+
+    async def consume(n: int) -> int:
+        count = 0
+        async for _ in arows(n):
+            count += 1
+        return count
+
+    with pytest.raises(TypeError):
+        asyncio.run(consume(2))
+
+
+def test_sampled_iterator_items() -> None:
+    """ Items are chosen by the sequence sampler, or the override for ``return``. """
+
+    @typechecked(sequence_sampling={"return": "first:2"})
+    def head(sizes: List[int]) -> Iterator[Array[float, 3]]:
+        """ Yield arrays with the given sizes. """
+        for size in sizes:
+            yield np.zeros((size,))
+
+    @typechecked
+    def loaded(sizes: List[int]) -> Iterable[Array[float, 3]]:
+        """ Return a sized loader of arrays with the given sizes. """
+        return SizedLoader(sizes)
+
+    assert len(list(head([3, 3, 4]))) == 3
+    with pytest.raises(TypeError):
+        list(head([3, 4]))
+
+    ox = get_ox()
+    ox.sequence_sampling = "last:1"
+    try:
+        assert len(list(loaded([4, 3]))) == 2
+        with pytest.raises(TypeError):
+            list(loaded([3, 4]))
+
+        # Streams without a length have their first items checked instead.
+        assert len(list(batches(np.zeros((2,)), [2, 5]))) == 2
+        ox.sequence_sampling = "time:60"
+        with pytest.raises(TypeError):
+            list(rows(3))
+        ox.sequence_sampling = "all"
+        ox.check_all_sequence_elements = False
+        assert len(list(rows(3))) == 3
+    finally:
+        ox.sequence_sampling = "all"
+        ox.check_all_sequence_elements = True
+
+
+def test_proxies_forward_attributes() -> None:
+    """ Attributes of returned iterators and generators are still reachable. """
+    gen = countdown(1)
+    assert gen.gi_frame is not None
+    assert gen.gi_running is False
+    it = rows(2)
+    assert it.gi_code.co_name == "rows"
+    with pytest.raises(AttributeError):
+        it.missing  # pylint: disable=pointless-statement
@@ -3,15 +3,37 @@
 # type: ignore
 """ Test the ``asta.typechecked`` decorator. """
 import os
+import asyncio
+import inspect
 import functools
-from typing import List, Tuple
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Set,
+    Dict,
+    List,
+    Type,
+    Tuple,
+    Union,
+    Callable,
+    Iterable,
+    Optional,
+)
 
 import numpy as np
 import pytest
 import hypothesis.extra.numpy as hnp
 from hypothesis import given
 
+import asta
 from asta import Array, dims, shapes, symbols, typechecked
+from asta.config import get_ox
+from asta.display import CURRENT_HEADER
+
+try:
+    from typing import Literal
+except ImportError:
+    Literal = None
 
 os.environ["ASTA_TYPECHECK"] = "1"
 
@@ -194,6 +216,241 @@ def test_subscriptable_generics():
         tuple_generic(bad_tuple)
 
 
+def test_homogeneous_containers() -> None:
+    """ Test that containers of arrays report the first offending element. """
+
+    @typechecked
+    def batch(arrs: List[Array[float, X, 3]]) -> Tuple[Array[float, X, 3], ...]:
+        """ Return ``arrs`` as a tuple. """
+        return tuple(arrs)
+
+    ox = get_ox()
+    ox.print_passes = False
+    try:
+        good = [np.zeros((2, 3)) for _ in range(100)]
+        assert len(batch(good)) == 100
+        bad = good + [np.zeros((2, 3), dtype=int), np.zeros((2, 4))]
+        with pytest.raises(TypeError, match=r"'arrs\[100\]'"):
+            batch(bad)
+        with pytest.raises(TypeError):
+            batch(good + [np.zeros((4, 3))])
+    finally:
+        ox.print_passes = True
+
+
+def test_homogeneous_containers_print_passes(capsys) -> None:
+    """ Test that passes are printed once per distinct element by default. """
+
+    @typechecked
+    def first(arrs: List[Array[float]]) -> Array[float]:
+        """ Return the first of ``arrs``. """
+        return arrs[0]
+
+    capsys.readouterr()
+    first([np.zeros((2, 3)) for _ in range(100)])
+    out = capsys.readouterr().out
+    assert "'arrs[0]'" in out and "'arrs[1]'" not in out
+    first([np.zeros((2, 3)), np.zeros((2, 3)), np.zeros((4,))])
+    out = capsys.readouterr().out
+    assert "'arrs[0]'" in out and "'arrs[1]'" not in out and "'arrs[2]'" in out
+    with pytest.raises(TypeError, match=r"'arrs\[2\]'"):
+        first([np.zeros((2, 3)), np.zeros((2, 3)), np.zeros((2, 3), dtype=int)])
+
+
+def test_unions(capsys) -> None:
+    """ Test that union members are tried without printing their failures. """
+    from asta.origins import UNION_SITES
+
+    @typechecked
+    def masked(
+        x: Union[Array[float, 2], Array[int, 3]], mask: Optional[Array[bool, 2]]
+    ) -> Union[Array[float, 2], Array[int, 3]]:
+        """ Return ``x``. """
+        return x
+
+    ints = np.zeros((3,), dtype=int)
+    masked(np.zeros((2,)), None)
+    for _ in range(3):
+        masked(ints, np.zeros((2,), dtype=bool))
+    with pytest.raises(TypeError):
+        masked(np.zeros((3,)), None)
+
+    # The more frequently matched member is now tried first.
+    site = next(site for key, site in UNION_SITES.items() if key[1] == "x")
+    assert site.order[0].dtype == np.dtype(int)
+
+    ox = get_ox()
+    ox.raise_errors = False
+    ox.print_passes = False
+    try:
+        capsys.readouterr()
+        masked(np.zeros((2,)), None)
+        masked(ints, None)
+        assert capsys.readouterr().out == ""
+        masked(np.zeros((3,)), None)
+        assert "must be one of" in capsys.readouterr().out
+    finally:
+        ox.raise_errors = True
+        ox.print_passes = True
+
+
+@pytest.mark.skipif(Literal is None, reason="requires typing.Literal")
+def test_union_predicates(monkeypatch) -> None:
+    """ Test that non-asta union members are tried without building failures. """
+    from asta import origins
+
+    def unexpected(*args) -> None:
+        raise AssertionError("A failure was built for a union member.")
+
+    for name in ("fail_fallback", "fail_literal", "fail_callable", "fail_class"):
+        monkeypatch.setattr(origins, name, unexpected)
+
+    @typechecked
+    def pick(x: Union[int, Literal["a"], Callable[[int], int], Type[str], str]):
+        """ Do nothing. """
+
+    ox = get_ox()
+    ox.check_non_asta_types = True
+    try:
+        for value in (1, "a", "b", len, str):
+            pick(value)
+    finally:
+        ox.check_non_asta_types = False
+
+
+def test_conflicting_bindings() -> None:
+    """ Test that a symbol bound twice fails at the element which rebinds it. """
+
+    @typechecked
+    def stack(xs: List[Array[float, X]]) -> Array[float, X]:
+        """ Return the first of ``xs``. """
+        return xs[0]
+
+    @typechecked
+    def step(obs: Array[float, X], act: Array[float, X]) -> None:
+        """ Do nothing. """
+
+    @typechecked
+    def either(x: Union[Array[float, X, 2], Array[float, 3]], y: Array[float, X]):
+        """ Do nothing. """
+
+    ox = get_ox()
+    ox.print_passes = False
+    try:
+        stack([np.zeros((2,)), np.zeros((2,))])
+        with pytest.raises(TypeError, match=r"'xs\[2\]' binds 'X' to 3"):
+            stack([np.zeros((2,)), np.zeros((2,)), np.zeros((3,))])
+
+        # Conflicts name the argument which bound the symbol first.
+        match = r"'act' binds 'X' to 31, but 'obs' already bound it to 32"
+        with pytest.raises(TypeError, match=match):
+            step(np.zeros((32,)), np.zeros((31,)))
+
+        # Bindings made by union members which failed are rolled back.
+        either(np.zeros((3,)), np.zeros((5,)))
+        with pytest.raises(TypeError, match=r"'y' binds 'X' to 5"):
+            either(np.zeros((4, 2)), np.zeros((5,)))
+    finally:
+        ox.print_passes = True
+
+
+def test_non_asta_dispatch() -> None:
+    """ Test that non-asta annotations are checked only when enabled. """
+    from asta.origins import check_annotation
+
+    def matches(value, annotation) -> bool:
+        try:
+            check_annotation("x", value, annotation, set(), ox)
+        except TypeError:
+            return False
+        return True
+
+    ox = get_ox()
+    assert matches("a", int) and matches(3, Callable[[int], int])
+    ox.check_non_asta_types = True
+    try:
+        assert matches(len, Callable[[int], int]) and not matches(3, Callable[..., int])
+        assert matches(int, Type[int]) and not matches(str, Type[int])
+        if Literal is not None:
+            assert matches(1, Literal[1, 2]) and not matches(3, Literal[1, 2])
+        assert matches(bytearray(), bytes) and not matches("a", int)
+    finally:
+        ox.check_non_asta_types = False
+    assert matches("a", int)
+
+
+def test_scalar_containers(capsys) -> None:
+    """ Test that containers of plain classes report each offending element. """
+
+    @typechecked
+    def lookup(ids: List[int], weights: Dict[str, float], tags: Set[str]) -> int:
+        """ Return the number of ids. """
+        return len(ids)
+
+    ids = list(range(1000))
+    weights = {str(i): float(i) for i in range(1000)}
+    ox = get_ox()
+    ox.check_non_asta_types = True
+    try:
+        assert lookup(ids, weights, {"a", "b"}) == 1000
+        with pytest.raises(TypeError, match=r"'ids\[1000\]'"):
+            lookup(ids + ["a"], weights, {"a"})
+        with pytest.raises(TypeError):
+            lookup(ids, {**weights, "x": "y"}, {"a"})
+        with pytest.raises(TypeError):
+            lookup(ids, weights, {"a", 1})
+
+        ox.raise_errors = False
+        ox.print_passes = False
+        capsys.readouterr()
+        lookup(ids + ["a", "b"], weights, {"a"})
+        assert capsys.readouterr().out.count("FAILED") == 2
+    finally:
+        ox.check_non_asta_types = False
+        ox.raise_errors = True
+        ox.print_passes = True
+
+    # Plain classes aren't checked otherwise.
+    assert lookup(["a"], {"x": "y"}, {1}) == 1
+
+
+def test_scalar_containers_streamed() -> None:
+    """ Test that elements are checked as they're iterated, up to a failure. """
+
+    class Counted(collections.abc.Collection):
+        """ A collection which records how many elements were iterated. """
+
+        def __init__(self, values):
+            self.values = values
+            self.iterated = 0
+
+        def __iter__(self):
+            for v in self.values:
+                self.iterated += 1
+                yield v
+
+        def __len__(self):
+            return len(self.values)
+
+        def __contains__(self, v):
+            return v in self.values
+
+    @typechecked
+    def total(xs: Iterable[int]) -> int:
+        """ Return the sum of ``xs``. """
+        return len(xs)
+
+    xs = Counted([1, 2, "a"] + list(range(1000)))
+    ox = get_ox()
+    ox.check_non_asta_types = True
+    try:
+        with pytest.raises(TypeError, match=r"'xs\[2\]'"):
+            total(xs)
+        assert xs.iterated == 3
+    finally:
+        ox.check_non_asta_types = False
+
+
 def test_placeholder_arithmetic():
     """ Test that placeholders support arithmetic. """
     t = np.ones((16 + 32,))
@@ -243,3 +500,158 @@ def test_shape_arithmetic() -> None:
         subscript_summation_2(t_8)
     with pytest.raises(TypeError):
         subscript_summation_3(t_9)
+
+
+@typechecked
+def default_argument(
+    arr: Array[float, 2, 3], addend: Array[float, 2, 3] = np.ones((2, 3))
+) -> Array[float, 2, 3]:
+    """ Test function. """
+    return arr + addend
+
+
+class Adder:
+    """ Test class. """
+
+    @typechecked
+    def add(self, arr: Array[float, 2, 3], addend: float) -> Array[float, 2, 3]:
+        """ Test method. """
+        return arr + addend
+
+
+def test_argument_binding() -> None:
+    """ Test that arguments are bound to the right annotations. """
+    a = np.zeros((2, 3))
+    b = np.zeros((3, 2))
+    default_argument(a)
+    default_argument(a, a)
+    default_argument(a, addend=a)
+    default_argument(addend=a, arr=a)
+    Adder().add(a, 1.0)
+    with pytest.raises(TypeError):
+        default_argument(b)
+    with pytest.raises(TypeError):
+        default_argument(a, b)
+    with pytest.raises(TypeError):
+        default_argument(a, addend=b)
+    with pytest.raises(TypeError):
+        default_argument(a, a, a)
+    with pytest.raises(TypeError):
+        default_argument(a, wrong=a)
+    with pytest.raises(TypeError):
+        Adder().add(b, 1.0)
+
+
+def test_argument_mismatch_message() -> None:
+    """ Test the message for mismatched arguments and annotations. """
+    message = (
+        "Mismatch between number of annotated non-(self / cls / mcs) parameters "
+        "'(2)' and number of arguments '(3)'. Possible causes: wrong number of "
+        "arguments, or missing type hint."
+    )
+    a = np.zeros((2, 3))
+    with pytest.raises(TypeError) as excinfo:
+        default_argument(a, a, a)
+    assert str(excinfo.value) == message
+
+
+def test_plan_binds_checkers(monkeypatch) -> None:
+    """ Test that calls don't classify annotations again. """
+    from asta import origins
+
+    @typechecked
+    def identity(arr: Array[float, 2], scale: float) -> Array[float, 2]:
+        """ Return ``arr``. """
+        return arr
+
+    def unexpected(*args) -> None:
+        raise AssertionError("An annotation was classified during a call.")
+
+    monkeypatch.setattr(origins, "get_checker", unexpected)
+    monkeypatch.setattr(origins, "resolve_checker", unexpected)
+    identity(np.zeros((2,)), 1.0)
+    with pytest.raises(TypeError):
+        identity(np.zeros((3,)), 1.0)
+
+
+def test_runtime_switch() -> None:
+    """ Test that typechecking can be turned off and on after decoration. """
+    b = np.zeros((3, 2))
+    try:
+        asta.disable()
+        assert not asta.is_enabled()
+        np_correct_type(b)
+
+        @typechecked
+        def decorated_while_off(arr: Array[int]) -> Array[int]:
+            """ Test function. """
+            return arr
+
+        decorated_while_off(b)
+        asta.enable()
+        with pytest.raises(TypeError):
+            decorated_while_off(b)
+        with pytest.raises(TypeError):
+            np_correct_type(b)
+    finally:
+        asta.enable()
+
+
+def test_environment_switch(monkeypatch) -> None:
+    """ Test that ``ASTA_TYPECHECK`` is honored when functions are decorated. """
+
+    def identity(arr: Array[int]) -> Array[int]:
+        """ Test function. """
+        return arr
+
+    monkeypatch.setenv("ASTA_TYPECHECK", "0")
+    assert typechecked(identity) is identity
+    monkeypatch.setenv("ASTA_TYPECHECK", "1")
+    checked = typechecked(identity)
+    assert checked is not identity
+    with pytest.raises(TypeError):
+        checked(np.zeros((3, 2)))
+
+
+def test_failure_header_is_per_call(capsys) -> None:
+    """ Test that failures print the header of the function which failed. """
+    ox = get_ox()
+    ox.print_passes = False
+    try:
+        with ThreadPoolExecutor(4) as executor:
+            futures = [
+                executor.submit(np_incorrect_type, np.zeros((2,), dtype=int))
+                for _ in range(8)
+            ]
+            for future in futures:
+                with pytest.raises(TypeError):
+                    future.result()
+    finally:
+        ox.print_passes = True
+    out = capsys.readouterr().out
+    assert out.count("np_incorrect_type()") == 8
+    assert CURRENT_HEADER.get() == ""
+
+
+@typechecked
+async def async_identity(arr: Array[float, 2]) -> Array[float, 2]:
+    """ Test coroutine function. """
+    await asyncio.sleep(0)
+    return arr
+
+
+@typechecked
+async def async_incorrect_return(arr: Array[float, 2]) -> Array[float, 3]:
+    """ Test coroutine function. """
+    return arr
+
+
+def test_coroutine_functions() -> None:
+    """ Test that coroutine functions have their awaited results checked. """
+    a = np.zeros((2,))
+    assert inspect.iscoroutinefunction(async_identity)
+    assert asyncio.run(async_identity(a)) is a
+    with pytest.raises(TypeError):
+        asyncio.run(async_identity(np.zeros((3,))))
+    with pytest.raises(TypeError):
+        asyncio.run(async_incorrect_return(a))
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+""" Tests for checking only a sample of calls. """
+import time
+from typing import Set, Dict, List
+
+import pytest
+import numpy as np
+
+from asta import Array, typechecked
+from asta.config import get_ox
+from asta.sampling import (
+    Sampler,
+    SequenceSampler,
+    get_sampler,
+    get_sequence_sampler,
+    parse_sequence_sampling,
+)
+
+# pylint: disable=no-value-for-parameter, invalid-name
+
+
+def test_sampler_first_and_every() -> None:
+    """ The first calls are always checked, then one in every ``every``. """
+    sampler = Sampler(first=2, every=3, rate=1.0)
+    sampled = [sampler.sample() for _ in range(9)]
+    assert sampled == [True, True, True, False, False, True, False, False, True]
+
+
+def test_sampler_rate() -> None:
+    """ A rate of zero checks nothing after the first calls. """
+    sampler = Sampler(first=1, every=1, rate=0.0)
+    assert [sampler.sample() for _ in range(4)] == [True, False, False, False]
+
+
+def test_get_sampler(monkeypatch) -> None:
+    """ The default policy checks everything, and env vars override config. """
+    ox = get_ox()
+    assert get_sampler(ox) is None
+    monkeypatch.setenv("ASTA_SAMPLE_EVERY", "4")
+    sampler = get_sampler(ox)
+    assert sampler.every == 4
+    monkeypatch.setenv("ASTA_SAMPLE_RATE", "2")
+    with pytest.raises(ValueError):
+        get_sampler(ox)
+
+
+def test_numeric_options() -> None:
+    """ Only numeric options are parsed as numbers, where they're used. """
+    from asta.config import parse_value
+
+    assert parse_value("yes") is True
+    for value in ("1", "1e3", "nan", "inf"):
+        assert parse_value(value) == value
+
+    ox = get_ox()
+    ox.sample_every = "3"
+    try:
+        assert get_sampler(ox).every == 3
+        ox.sample_every = "1e3"
+        with pytest.raises(ValueError):
+            get_sampler(ox)
+    finally:
+        ox.sample_every = 1
+    with pytest.raises(ValueError):
+        parse_sequence_sampling("time:nan", 0)
+
+
+def test_sampled_decorator(monkeypatch) -> None:
+    """ Calls which aren't sampled aren't checked. """
+    monkeypatch.setenv("ASTA_SAMPLE_FIRST", "1")
+    monkeypatch.setenv("ASTA_SAMPLE_EVERY", "2")
+
+    @typechecked
+    def identity(x: Array[float, 3]) -> Array[float, 3]:
+        """ Return ``x``. """
+        return x
+
+    identity(np.zeros((3,)))
+    identity(np.zeros((3,)))
+    identity(np.zeros((4,)))
+    with pytest.raises(TypeError):
+        identity(np.zeros((4,)))
+
+
+def test_sequence_sampler_strategies() -> None:
+    """ Each strategy picks the expected indices. """
+    values = list(range(10))
+
+    def indices(spec: str) -> List[int]:
+        return [i for i, _ in parse_sequence_sampling(spec, 0).select(values)]
+
+    assert indices("all") == values
+    assert indices("first:3") == [0, 1, 2]
+    assert indices("last:3") == [7, 8, 9]
+    assert indices("strided:4") == [0, 3, 6, 9]
+    assert indices("strided:20") == values
+    sampled = indices("random:4")
+    assert len(sampled) == 4 and sampled == sorted(set(sampled))
+    assert sampled == indices("random:4")
+    assert indices("time:60") == values
+    assert [v for _, v in SequenceSampler("last", 2).select(set(values))] == [8, 9]
+    for spec in ("every:2", "first:0", "first:x", "time", "all:3"):
+        with pytest.raises(ValueError):
+            parse_sequence_sampling(spec, 0)
+
+
+def test_global_sequence_sampling() -> None:
+    """ The configured strategy applies to lists, sets and dicts alike. """
+
+    @typechecked
+    def containers(
+        xs: List[Array[float, 2]], ys: Set[int], zs: Dict[str, Array[float, 2]]
+    ) -> None:
+        """ Do nothing. """
+
+    xs = [np.zeros((2,))] * 3 + [np.zeros((3,))]
+    zs = {str(i): x for i, x in enumerate(xs)}
+    ox = get_ox()
+    with pytest.raises(TypeError):
+        containers(xs, {1}, zs)
+    ox.sequence_sampling = "first:3"
+    try:
+        assert get_sequence_sampler(ox).size == 3
+        containers(xs, {1}, zs)
+        ox.check_all_sequence_elements = False
+        ox.sequence_sampling = "all"
+        containers(xs, {1}, zs)
+    finally:
+        ox.sequence_sampling = "all"
+        ox.check_all_sequence_elements = True
+
+
+def test_per_parameter_sequence_sampling() -> None:
+    """ Strategies given to the decorator override the global one. """
+
+    @typechecked(sequence_sampling={"xs": "first:2"})
+    def lengths(xs: List[Array[float, 2]], ys: List[Array[float, 2]]) -> int:
+        """ Return the length of ``xs``. """
+        return len(xs)
+
+    good = [np.zeros((2,))] * 2
+    bad = good + [np.zeros((3,))]
+    assert lengths(bad, good) == 3
+    with pytest.raises(TypeError):
+        lengths(good, bad)
+    with pytest.raises(ValueError):
+        typechecked(sequence_sampling={"zs": "all"})(lengths.__wrapped__)
+
+
+def test_class_sequence_sampling() -> None:
+    """ Strategies given to a class decorator apply to the methods they name. """
+
+    @typechecked(sequence_sampling={"xs": "first:2"})
+    class Buffer:
+        """ Methods with and without ``xs``. """
+
+        def extend(self, xs: List[Array[float, 2]]) -> int:
+            """ Return the length of ``xs``. """
+            return len(xs)
+
+        def count(self, ys: List[Array[float, 2]]) -> int:
+            """ Return the length of ``ys``. """
+            return len(ys)
+
+    good = [np.zeros((2,))] * 2
+    bad = good + [np.zeros((3,))]
+    assert Buffer().extend(bad) == 3
+    with pytest.raises(TypeError):
+        Buffer().count(bad)
+    with pytest.raises(ValueError, match=r"'zs' of '.*Buffer'"):
+        typechecked(sequence_sampling={"zs": "all"})(Buffer)
+
+
+def test_time_budget_covers_checks() -> None:
+    """ The ``time`` strategy stops checking elements once its budget runs out. """
+    checked = []
+
+    class SlowMeta(type):
+        """ A metaclass whose instance checks are expensive. """
+
+        def __instancecheck__(cls, instance):
+            checked.append(instance)
+            time.sleep(0.01)
+            return True
+
+    class Slow(metaclass=SlowMeta):
+        """ Matches anything, slowly. """
+
+    # Elements of distinct types, so that each one is checked.
+    elements = [type(f"Element{i}", (), {})() for i in range(100)]
+    spec = "time:0.02"
+
+    @typechecked(sequence_sampling={"xs": spec, "ys": spec, "zs": spec})
+    def count(xs: List[Slow], ys: Set[Slow], zs: Dict[str, Slow]) -> int:
+        """ Return the number of elements. """
+        return len(xs) + len(ys) + len(zs)
+
+    ox = get_ox()
+    ox.check_non_asta_types = True
+    try:
+        start = time.perf_counter()
+        zs = {str(i): v for i, v in enumerate(elements)}
+        assert count(elements, set(elements), zs) == 300
+        assert time.perf_counter() - start < 1.0
+        assert 3 <= len(checked) < 30
+    finally:
+        ox.check_non_asta_types = False
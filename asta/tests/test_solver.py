@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+""" Tests for the native dimension equation solver. """
+from fractions import Fraction
+
+from asta import symbols
+from asta.utils import astasolver, check_equal
+from asta.solver import linear_form, compile_dimension
+from asta.constraints import Constraints
+
+# pylint: disable=no-value-for-parameter, invalid-name
+
+X = symbols.X
+Y = symbols.Y
+Z = symbols.Z
+
+
+def test_solver_binds_linear_equations() -> None:
+    """ Make sure the common linear cases are solved to integers. """
+    assert astasolver({X - 32}) == (True, {X}, [{X: 32}])
+    assert astasolver({2 * X + 1 - 65}) == (True, {X}, [{X: 32}])
+    assert astasolver({X - 10, X + Y - 4}) == (True, {X, Y}, [{X: 10, Y: -6}])
+    assert astasolver({X + Y - 5, X - Y - 1}) == (True, {X, Y}, [{X: 3, Y: 2}])
+    assert astasolver(set()) == (True, set(), [])
+
+
+def test_solver_rejects_inconsistent_equations() -> None:
+    """ Conflicting bindings and fractional sizes have no solution. """
+    assert not astasolver({X - 3, X - 4})[0]
+    assert not astasolver({2 * X - 3})[0]
+    assert not astasolver({X + Y - 3, X + Y - 4})[0]
+
+
+def test_solver_is_lenient_for_underdetermined_systems() -> None:
+    """ Systems with infinitely many solutions still match. """
+    assert astasolver({X + Y - 50})[0]
+    assert astasolver({X + Y + Z - 6, X - Y})[0]
+
+
+def test_solver_falls_back_for_nonlinear_equations() -> None:
+    """ Nonlinear equations are solved after substituting linear bindings. """
+    solvable, _, solutions = astasolver({X ** 2 - 256})
+    assert solvable
+    assert {X: 16} in solutions
+    assert astasolver({X * Y - 6, X - 2}) == (True, {X, Y}, [{X: 2, Y: 3}])
+    assert not astasolver({X * Y - 7, X - 2})[0]
+
+
+def test_constraints_resume_from_previous_solution() -> None:
+    """ Equations added after a solve are solved along with its bindings. """
+    equations = Constraints({X + Y - 5, X - Y - 1})
+    assert equations.solve() == (True, {X, Y}, [{X: 3, Y: 2}])
+    partial = equations.solved[1]
+
+    equations.extend({Z - 2 * Y})
+    assert equations.solve() == (True, {X, Y, Z}, [{X: 3, Y: 2, Z: 4}])
+    assert partial.bindings == {X: 3, Y: 2}
+
+    # Underdetermined equations are carried forward, too.
+    equations = Constraints({X + Y - 50})
+    assert equations.solve()[0]
+    equations.extend({X - Y})
+    assert equations.solve() == (True, {X, Y}, [{X: 25, Y: 25}])
+    equations.extend({X + Z - 7 * Z})
+    assert not equations.solve()[0]
+
+
+def test_dimensions_compile_to_affine_forms() -> None:
+    """ Linear dimension expressions are evaluated with integer arithmetic. """
+    form = compile_dimension(2 * X + Y + 1)
+    assert form.evaluate({X: 3, Y: 4}) == 11
+    assert isinstance(form.evaluate({X: 3, Y: 4}), int)
+    assert form.evaluate({X: 3}) is None
+    assert form.equation(11) is form.equation(11)
+    assert form.equation(11) == 2 * X + Y - 10
+    assert compile_dimension(X / 2).evaluate({X: 3}) == Fraction(3, 2)
+    assert compile_dimension(X ** 2) is None
+
+    # Integral coefficients stay integers, so solving needs no ``Fraction``.
+    assert linear_form(3 * X - 6) == ({X: 3}, -6)
+    assert astasolver({3 * X - 6}) == (True, {X}, [{X: 2}])
+    assert not astasolver({3 * X - 7})[0]
+
+
+def test_check_equal_compares_linear_expressions() -> None:
+    """ Expression-expression comparisons don't need ``simplify``. """
+    assert check_equal((X + 1,), (1 + X,), set())[0]
+    assert not check_equal((X + 1,), (X + 2,), set())[0]
+    assert check_equal(((X + 1) ** 2,), (X ** 2 + 2 * X + 1,), set())[0]
@@ -1,70 +1,74 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-""" Dummy classes for use when ``torch`` or ``tensorflow`` are not installed. """
-from abc import abstractmethod
-from typing import Any, Dict, Tuple
-
-import numpy as np
+"""
+Stand-ins for ``Tensor`` and ``TFTensor`` for when ``torch`` or ``tensorflow``
+have not been imported yet. Subscripting a stand-in imports its backend (or
+raises a meaningful ImportError if it is not installed), and all other
+operations defer to the real class once the backend has been imported.
+"""
+from typing import Any, Dict, Optional
 
 from asta.classes import GenericMeta, SubscriptableMeta
+from asta.backends import wire, get_wired
 
-# pylint: disable=import-outside-toplevel, unused-import, too-few-public-methods
+# pylint: disable=too-few-public-methods
 
 
 class UnusableMeta(SubscriptableMeta):
-    """ A meta class for the dummy ``Tensor`` and ``TFTensor`` classes. """
+    """ A meta class for the stand-in ``Tensor`` and ``TFTensor`` classes. """
 
     NAME: str = ""
-    dtype: np.dtype = np.dtype("float64")
-    shape: Tuple = ()
+    BACKEND: str = ""
+    dtype: Any = None
+    shape: Any = None
     kwattrs: Dict[str, Any] = {}
 
-    @classmethod
-    @abstractmethod
-    def _after_subscription(cls, item: Any) -> None:
-        """ Method signature for subscript argument processing. """
-        raise NotImplementedError
-
-    @classmethod
-    @abstractmethod
-    def _import(cls) -> None:
-        """ Attempts to import the dependency so a meaningful ImportError is shown. """
-        raise NotImplementedError
+    def resolve(cls) -> GenericMeta:
+        """ Return the real class if its backend has been imported, else ``cls``. """
+        real: Optional[GenericMeta] = get_wired().get(cls.BACKEND)
+        return real if real is not None else cls
 
     def __getitem__(cls, item: Any) -> GenericMeta:
-        """ Should always raise an ImportError. """
-        cls._import()
-        return SubscriptableMeta.__getitem__(cls, item)
+        """ Import the backend and subscript the real class. """
+        real: GenericMeta = wire(cls.BACKEND)
+        subscripted: GenericMeta = real[item]  # type: ignore[index]
+        return subscripted
 
     def __eq__(cls, other: Any) -> bool:
-        """ Should always raise an ImportError. """
-        cls._import()
-        return super().__eq__(other)
+        """ Compare the real class if the backend has been imported. """
+        real = cls.resolve()
+        if real is cls:
+            return other is cls
+        return real == other  # type: ignore[no-any-return]
+
+    def __hash__(cls) -> int:
+        """ Just calls __hash__ of SubscriptableMeta. """
+        return super().__hash__()
 
     def __repr__(cls) -> str:
-        """ Should always raise an ImportError. """
-        cls._import()
-        return super().__repr__()
+        """ Defer to the real class if the backend has been imported. """
+        real = cls.resolve()
+        if real is cls:
+            return f"<asta.{cls.NAME}>"
+        return repr(real)
 
     def __instancecheck__(cls, inst: Any) -> bool:
-        """ Should always raise an ImportError. """
-        cls._import()
-        return False
+        """ Nothing is a tensor until the backend has been imported. """
+        real = cls.resolve()
+        if real is cls:
+            return False
+        return isinstance(inst, real)
 
 
 class Tensor(metaclass=UnusableMeta):
-    """ A dummy class for use when ``torch`` is not installed. """
+    """ A stand-in class for use until ``torch`` has been imported. """
 
-    @classmethod
-    def _import(cls) -> None:
-        """ Attempts to import the dependency so a meaningful ImportError is shown. """
-        import torch
+    NAME: str = "Tensor"
+    BACKEND: str = "torch"
 
 
 class TFTensor(metaclass=UnusableMeta):
-    """ A dummy class for use when ``tensorflow`` is not installed. """
+    """ A stand-in class for use until ``tensorflow`` has been imported. """
 
-    @classmethod
-    def _import(cls) -> None:
-        """ Attempts to import the dependency so a meaningful ImportError is shown. """
-        import tensorflow
+    NAME: str = "TFTensor"
+    BACKEND: str = "tensorflow"
@@ -5,19 +5,12 @@ import random
 import functools
 from typing import Any, Set, Dict, List, Tuple, Union, Optional
 
-from sympy import solvers, simplify
+from sympy import simplify
 from sympy.core.expr import Expr
 from sympy.core.symbol import Symbol
 
-from asta.constants import (
-    _TORCH_IMPORTED,
-    _TENSORFLOW_IMPORTED,
-    EllipsisType,
-    GenericArray,
-    NonInstanceType,
-    tf,
-    torch,
-)
+from asta.constants import EllipsisType, GenericArray, NonInstanceType
+from asta.solver import solve, linear_form, compile_dimension
 
 # pylint: disable=too-many-boolean-expressions, too-many-branches
 
@@ -27,135 +20,196 @@ def shapecheck(
     cls_shape: Optional[Tuple[Union[int, EllipsisType], ...]],  # type: ignore[valid-type]
 ) -> Tuple[bool, Set[Expr]]:
     """ Check ``inst_shape`` is an instance of ``cls_shape``. """
-    match = True
-    equations: Set[Expr] = set()
-
     if cls_shape is None:
-        return match, equations
+        return True, set()
 
     assert isinstance(inst_shape, tuple)
+    return get_matcher(cls_shape).match(inst_shape)
 
-    # The portions of ``inst_shape`` which correspond to each ``cls_shape`` elem.
-    shape_pieces: List[Tuple[int, ...]] = []
 
-    # Case 1: No ellipses or wildcards.
-    if Ellipsis not in cls_shape and -1 not in cls_shape:
-        equal, equations = check_equal(cls_shape, inst_shape, equations)
+# Kinds of elements of annotation shapes.
+ELLIPSIS = 0
+WILDCARD = 1
+LITERAL = 2
+SYMBOLIC = 3
+AFFINE = 4
 
-        if not equal:
-            match = False
-        shape_pieces = [(elem,) for elem in inst_shape]
-
-    # Case 2: Only an ellipsis, and instance shape is empty.
-    elif cls_shape == (Ellipsis,) and inst_shape == ():
-        match = True
-        shape_pieces = [tuple()]
-
-    # Case 3: Nonempty, not an ellipsis, and instance shape is empty.
-    elif inst_shape == () != cls_shape:
-        match = False
-
-    # Case 4: Ellipsis, and instance shape has a zero (empty tensor).
-    elif cls_shape == (Ellipsis,) and 0 in inst_shape:
-        match = False
-
-    # Case 5: Everything else.
-    else:
-        if is_subtuple((Ellipsis, Ellipsis), cls_shape, equations)[0]:
-            raise TypeError("Invalid shape: repeated '...'")
-
-        # Determine if/where '...' bookends ``cls_shape``.
-        left_bookend = False
-        right_bookend = False
-        ellipsis_positions: List[int] = []
-        for i, elem in enumerate(cls_shape):
-            if elem == Ellipsis:
-                ellipsis_positions.append(i)
-
-                # e.g. ``Array[..., 1, 2, 3]``.
-                if i == 0:
-                    left_bookend = True
-
-                # e.g. ``Array[1, 2, 3, ...]``.
-                if i == len(cls_shape) - 1:
-                    right_bookend = True
-
-        # Analogous to ``str.split(<elem>)``, we split the shape on '...'.
-        frags: List[Tuple[int, ...]] = split(cls_shape, Ellipsis)
-
-        # Index in ``cls_shape`` as we construct ``shape_pieces``.
-        cls_idx = 0
-
-        # ``ishape`` is the remaining portion of the instance shape.
-        ishape = inst_shape
-        for i, frag in enumerate(frags):
-
-            # Look for ``frag`` in ``ishape``, and find starting index.
-            is_sub, index, equations = is_subtuple(frag, ishape, equations)
-
-            # Must have ``frag`` contained in ``ishape``.
-            if not is_sub:
-                match = False
-                break
+# A fragment of an annotation shape, as ``(kind, element)`` pairs.
+Fragment = Tuple[Tuple[int, Any], ...]
 
-            # First fragment must start at 0 if '...' is not the first
-            # element of ``cls_shape``.
-            if i == 0 and not left_bookend and index != 0:
-                match = False
-                break
 
-            # Last fragement must end at (exclusive) ``len(ishape)`` if
-            # '...' is not the last element of ``cls_shape``.
-            if (
-                i == len(frags) - 1
-                and not right_bookend
-                and index + len(frag) != len(ishape)
-            ):
-                match = False
-                break
+class ShapeMatcher:
+    """
+    An annotation shape compiled for matching against instance shapes. The
+    shape is split on ``...`` into a fixed prefix, a fixed suffix, and the
+    fragments in between, each of which is stored with the kinds of its
+    elements precomputed. Matching checks the prefix and suffix in place, then
+    searches for positions of the middle fragments, backtracking when a later
+    fragment can't be placed or the resulting equations have no solution.
+
+    Wildcards (``-1``) match any nonzero dimension, ``...`` matches any number
+    of nonzero dimensions, and symbolic elements match any dimension, adding an
+    equation which must have a solution. Linear symbolic elements are compiled
+    to ``AffineForm`` objects, which memoize their equations.
+
+    Parameters
+    ----------
+    shape : ``Tuple[Union[int, EllipsisType], ...]``.
+        The annotation shape.
+    """
 
-            # The subseq of ``ishape`` being substituted for ``...``.
-            substituted = ishape[:index]
+    def __init__(self, shape: Tuple[Union[int, EllipsisType], ...]):  # type: ignore
+        elems: Fragment = tuple(compile_element(elem) for elem in shape)
+        fragments: List[Fragment] = [()]
+        for i, (kind, elem) in enumerate(elems):
+            if kind == ELLIPSIS:
+                if i > 0 and elems[i - 1][0] == ELLIPSIS:
+                    raise TypeError("Invalid shape: repeated '...'")
+                fragments.append(())
+            else:
+                fragments[-1] += ((kind, elem),)
+
+        self.variadic = len(fragments) > 1
+        self.symbolic = any(kind in (SYMBOLIC, AFFINE) for kind, _ in elems)
+        self.prefix: Fragment = fragments[0]
+        self.suffix: Fragment = fragments[-1] if self.variadic else ()
+        self.middle: List[Fragment] = fragments[1:-1]
+        self.min_length = sum(len(fragment) for fragment in fragments)
+
+        # Shapes which can be matched against bound symbols by integer equality.
+        self.fixed: Optional[Fragment] = None if self.variadic else self.prefix
+
+        # Minimum length of the middle of a shape which fits fragments ``i:``.
+        self.tail_lengths = [
+            sum(len(fragment) for fragment in self.middle[i:])
+            for i in range(len(self.middle) + 1)
+        ]
+
+    def match(self, inst_shape: Tuple[int, ...]) -> Tuple[bool, Set[Expr]]:
+        """ Check if ``inst_shape`` matches, and return the resulting equations. """
+        equations: Set[Expr] = set()
+        length = len(inst_shape)
+        if not self.variadic:
+            if length != self.min_length:
+                return False, equations
+            if not match_fragment(self.prefix, inst_shape, 0, equations):
+                return False, equations
+            return self.solvable(equations), equations
 
-            # Can't match zero-size dims with ``...``.
-            if 0 in substituted:
-                match = False
+        if length < self.min_length:
+            return False, equations
+        end = length - len(self.suffix)
+        if not match_fragment(self.prefix, inst_shape, 0, equations):
+            return False, equations
+        if not match_fragment(self.suffix, inst_shape, end, equations):
+            return False, equations
+        return self.place(0, len(self.prefix), end, inst_shape, equations)
+
+    def place(
+        self,
+        index: int,
+        start: int,
+        end: int,
+        inst_shape: Tuple[int, ...],
+        equations: Set[Expr],
+    ) -> Tuple[bool, Set[Expr]]:
+        """
+        Place the middle fragments from ``index`` onwards within
+        ``inst_shape[start:end]``, such that the gaps left for ``...`` contain
+        no zeros.
+        """
+        if index == len(self.middle):
+            for i in range(start, end):
+                if inst_shape[i] == 0:
+                    return False, equations
+            return self.solvable(equations), equations
+
+        fragment = self.middle[index]
+        for i in range(start, end - self.tail_lengths[index] + 1):
+            candidate = set(equations) if self.symbolic else equations
+            if match_fragment(fragment, inst_shape, i, candidate):
+                placed, result = self.place(
+                    index + 1, i + len(fragment), end, inst_shape, candidate
+                )
+                if placed:
+                    return True, result
+
+            # The gap for the preceding ``...`` can't extend past a zero.
+            if inst_shape[i] == 0:
                 break
 
-            cls_elem = cls_shape[cls_idx]
-            if cls_elem == Ellipsis:
-                shape_pieces.append(substituted)
-                cls_idx += 1
-
-            ifrag = ishape[index : index + len(frag)]
-            for elem in ifrag:
-                shape_pieces.append((elem,))
-                cls_idx += 1
-
-            new_start = index + len(frag)
-            ishape = ishape[new_start:]
-
-        # If ``cls_shape`` ends with ``...``, ensure substituted tuple has no 0s.
-        if right_bookend and 0 in ishape:
-            match = False
-
-        if right_bookend:
-            substituted = ishape
-            cls_elem = cls_shape[cls_idx]
-            if cls_elem == Ellipsis:
-                shape_pieces.append(substituted)
-                cls_idx += 1
-
-        if match:
-            reconstructed = functools.reduce(lambda a, b: a + b, shape_pieces)
-            assert reconstructed == inst_shape
-            assert len(shape_pieces) == len(cls_shape) == cls_idx
-
-    # Solve our system of equations if it is nonempty.
-    if match:
-        match, _, _ = astasolver(equations)
+        return False, equations
 
-    return match, equations
+    def solvable(self, equations: Set[Expr]) -> bool:
+        """ Whether the equations from symbolic elements have a solution. """
+        if not equations:
+            return True
+        solvable, _, _ = astasolver(set(equations))
+        return solvable
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_shape(
+    shape: Tuple[Union[int, EllipsisType], ...]  # type: ignore[valid-type]
+) -> ShapeMatcher:
+    """ Return a (cached) matcher for the annotation shape ``shape``. """
+    return ShapeMatcher(shape)
+
+
+def get_matcher(
+    shape: Tuple[Union[int, EllipsisType], ...]  # type: ignore[valid-type]
+) -> ShapeMatcher:
+    """ Return a matcher for ``shape``, cached unless ``shape`` is unhashable. """
+    try:
+        hash(shape)
+    except TypeError:
+        return ShapeMatcher(shape)
+    return compile_shape(shape)
+
+
+def shape_kind(elem: Any) -> int:
+    """ Classify an element of an annotation shape. """
+    if elem is Ellipsis:
+        return ELLIPSIS
+    if isinstance(elem, Expr):
+        return SYMBOLIC
+    if isinstance(elem, int) and elem == -1:
+        return WILDCARD
+    return LITERAL
+
+
+def compile_element(elem: Any) -> Tuple[int, Any]:
+    """ Classify an element of an annotation shape, compiling linear ones. """
+    kind = shape_kind(elem)
+    if kind == SYMBOLIC:
+        form = compile_dimension(elem)
+        if form is not None:
+            return AFFINE, form
+    return kind, elem
+
+
+def match_fragment(
+    fragment: Fragment, inst_shape: Tuple[int, ...], start: int, equations: Set[Expr]
+) -> bool:
+    """ Check if ``fragment`` matches ``inst_shape`` at index ``start``. """
+    for offset, (kind, elem) in enumerate(fragment):
+        dim = inst_shape[start + offset]
+        if not isinstance(dim, int):
+            expression = elem.expression if kind == AFFINE else elem
+            equal, _ = check_equal((expression,), (dim,), equations)
+            if not equal:
+                return False
+        elif kind == AFFINE:
+            equations.add(elem.equation(dim))
+        elif kind == LITERAL:
+            if dim != elem:
+                return False
+        elif kind == WILDCARD:
+            if dim == 0:
+                return False
+        else:
+            equations.add(elem - dim)
+    return True
 
 
 def attrcheck(
@@ -194,58 +248,8 @@ def astasolver(
     if not equations:
         return True, set(), []
 
-    symbols: Set[Symbol] = set()
-    for equation in equations:
-        symbols = symbols.union(equation.free_symbols)
-    solutions: List[Dict[Symbol, int]] = solvers.solve(equations, symbols, dict=True)
-
-    # Removed pruning of symbolic solutions.
-    pruned_solutions: List[Dict[Symbol, Expr]] = solutions
-
-    # If we don't get at least one solution, it's not a match.
-    return len(pruned_solutions) >= 1, symbols, pruned_solutions
-
-
-def is_subtuple(
-    sub: Tuple[Union[int, EllipsisType], ...],  # type: ignore[valid-type]
-    tup: Tuple[Union[int, EllipsisType], ...],  # type: ignore[valid-type]
-    equations: Set[Expr],
-) -> Tuple[bool, int, Set[Expr]]:
-    """ Check for tuple inclusion, return index of first one. """
-    assert isinstance(sub, tuple)
-    assert isinstance(tup, tuple)
-    for i in range(len(tup) - len(sub) + 1):
-        equal, equations = check_equal(sub, tup[i : i + len(sub)], equations)
-        if equal:
-            return True, i, equations
-    return False, -1, equations
-
-
-def split(
-    shape: Tuple[Union[int, EllipsisType], ...],  # type: ignore[valid-type]
-    elem: Union[int, EllipsisType],  # type: ignore[valid-type]
-) -> List[Tuple[int, ...]]:
-    """ Split on an element. """
-    shape_list = list(shape)
-    tokens: List[str] = []
-    for num in shape_list:
-        if num == elem:
-            tokens.append("@")
-        else:
-            assert isinstance(num, int)
-            tokens.append(str(num))
-    seq: str = ",".join(tokens)
-    comma_fragments: List[str] = seq.split("@")
-
-    result: List[Tuple[int, ...]] = []
-    for frag in comma_fragments:
-        if frag:
-            frag_tokens = [token for token in frag.split(",") if token]
-            frag_nums = [int(token) for token in frag_tokens]
-            frag_tuple = tuple(frag_nums)
-            result.append(frag_tuple)
-
-    return result
+    # Linear systems are solved natively, sympy is only used for nonlinear ones.
+    return solve(equations)
 
 
 def check_equal(
@@ -275,17 +279,32 @@ def check_equal(
 
         # Case 2: ``x`` is an expression.
         if isinstance(x, Expr) and isinstance(y, int):
-            equations.add(x - y)
+            equations.add(make_equation(x, y))
             continue
 
         # Case 3: ``y`` is an expression.
         if isinstance(y, Expr) and isinstance(x, int):
-            equations.add(y - x)
+            equations.add(make_equation(y, x))
             continue
 
         if isinstance(x, Expr) and isinstance(y, Expr):
 
-            if simplify(x - y) != 0:
+            # Linear expressions are equal if their compiled forms are.
+            x_form = compile_dimension(x)
+            y_form = compile_dimension(y)
+            if x_form is not None and y_form is not None:
+                if not x_form.equals(y_form):
+                    return False, equations
+                continue
+
+            # Only simplify when the difference isn't linear.
+            difference = x - y
+            form = linear_form(difference)
+            if form is not None:
+                coefficients, constant = form
+                if coefficients or constant != 0:
+                    return False, equations
+            elif simplify(difference) != 0:
                 return False, equations
             continue
 
@@ -294,12 +313,18 @@ def check_equal(
     return True, equations
 
 
+def make_equation(expression: Expr, size: int) -> Expr:
+    """ Return the equation ``expression - size``, memoized if it is linear. """
+    form = compile_dimension(expression)
+    if form is None:
+        return expression - size
+    return form.equation(size)
+
+
 def rand_split_shape(shape: Any) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
     """ Splits a shape and removes a nonempty continguous portion. """
-    if _TORCH_IMPORTED and isinstance(shape, torch.Size):
-        shape = tuple(shape)
-    if _TENSORFLOW_IMPORTED and isinstance(shape, tf.TensorShape):
-        shape = tuple(shape)
+    # Handle e.g. ``torch.Size`` and ``tf.TensorShape``.
+    shape = tuple(shape)
     start = random.randrange(len(shape))
     end = random.randint(start + 1, len(shape))
     left = shape[:start]
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the per-call overhead of ``@typechecked``. Each case times a
+decorated function against the same function undecorated, with pass printing
+turned off. Cases which need ``torch`` are skipped if it isn't installed.
+
+Usage: ``python benchmarks/run.py [--number N] [--repeat R] [-k SUBSTRING]``.
+"""
+import os
+import sys
+import timeit
+import argparse
+import subprocess
+from typing import Any, Dict, List, Tuple, Callable, Optional, NamedTuple
+
+import numpy as np
+
+# Benchmark this checkout rather than an installed asta.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position, import-outside-toplevel, invalid-name
+
+from asta import Array, dims, shapes, symbols, typechecked
+from asta.config import get_ox
+
+X = symbols.X
+
+
+class Case(NamedTuple):
+    """ A function to time with and without typechecking, and its arguments. """
+
+    name: str
+    func: Callable[..., Any]
+    args: Tuple[Any, ...]
+    checked: Optional[Callable[..., Any]] = None
+
+
+def annotated(annotation: Any) -> Callable[[Any], Any]:
+    """ An identity function which takes and returns ``annotation``. """
+
+    def _identity(x: Any) -> Any:
+        return x
+
+    _identity.__annotations__ = {"x": annotation, "return": annotation}
+    return _identity
+
+
+def numpy_cases() -> List[Case]:
+    """ Cases which only need numpy. """
+    dims.BENCH_D = 8
+    shapes.BENCH_S = (8, 64)
+    arr = np.zeros((8, 64))
+    return [
+        Case("Array[float, 8, 64]", annotated(Array[float, 8, 64]), (arr,)),
+        Case("Array[float, ..., 64]", annotated(Array[float, ..., 64]), (arr,)),
+        Case("Array[float, 8, ...]", annotated(Array[float, 8, ...]), (arr,)),
+        Case("Array[float, X, 8 * X]", annotated(Array[float, X, 8 * X]), (arr,)),
+        Case(
+            "Array[float, dims.D, 64]",
+            annotated(Array[float, dims.BENCH_D, 64]),
+            (arr,),
+        ),
+        Case("Array[float, shapes.S]", annotated(Array[float, shapes.BENCH_S]), (arr,)),
+        Case(
+            "Dict[str, Array[float, 8, 64]]",
+            annotated(Dict[str, Array[float, 8, 64]]),
+            ({str(i): arr for i in range(8)},),
+        ),
+        Case(
+            "List[Array[float, X, 64]] (1000)",
+            annotated(List[Array[float, X, 64]]),
+            ([arr] * 1000,),
+        ),
+    ]
+
+
+def torch_cases() -> List[Case]:
+    """ Cases which need torch, including the policy gradient functions. """
+    import torch
+    from asta import Tensor
+
+    shapes.OB = (4,)
+    dims.NUM_ACTIONS = 2
+    from asta.tests.rl import pg
+
+    tensor = torch.zeros((8, 64))
+    policy = pg.Policy(4, 2, 32)
+    obs = torch.zeros((16, 4))
+    act = torch.zeros((16,)).int()
+    weights = torch.zeros((16,))
+    forward = pg.Policy.forward
+    return [
+        Case(
+            "List[Tensor[float, 8, 64]]",
+            annotated(List[Tensor[float, 8, 64]]),
+            ([tensor] * 8,),
+        ),
+        Case(
+            "pg.compute_loss",
+            pg.compute_loss.__wrapped__,
+            (policy, obs, act, weights),
+            pg.compute_loss,
+        ),
+        Case("pg.Policy.forward", forward.__wrapped__, (policy, obs), forward),
+    ]
+
+
+def best_us(
+    func: Callable[..., Any], args: Tuple[Any, ...], number: int, repeat: int
+) -> float:
+    """ The best time per call of ``func(*args)`` in microseconds. """
+    times = timeit.repeat(lambda: func(*args), number=number, repeat=repeat)
+    return min(times) / number * 1e6
+
+
+def import_time(repeat: int) -> float:
+    """ The best time to ``import asta`` in a fresh interpreter, in milliseconds. """
+    code = "import time; start = time.perf_counter(); import asta; "
+    code += "print(time.perf_counter() - start)"
+    times = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            check=True,
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(times) * 1e3
+
+
+def main() -> None:
+    """ Run the benchmarks and print a table of results. """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=2000, help="Calls per timing.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timings per case.")
+    parser.add_argument("-k", dest="keyword", default="", help="Only matching cases.")
+    args = parser.parse_args()
+
+    ox = get_ox()
+    ox.print_passes = False
+
+    cases = numpy_cases()
+    try:
+        cases += torch_cases()
+    except (ImportError, TypeError) as err:
+        # Some torch versions can't be imported alongside asta's ``Tensor``,
+        # whose metaclass conflicts with theirs.
+        print(f"Skipping torch cases: {err!r}")
+
+    print(f"{'case':<34}{'baseline':>12}{'checked':>12}{'overhead':>12}")
+    for case in cases:
+        if args.keyword not in case.name:
+            continue
+        checked = case.checked if case.checked is not None else typechecked(case.func)
+        base = best_us(case.func, case.args, args.number, args.repeat)
+        total = best_us(checked, case.args, args.number, args.repeat)
+        row = f"{case.name:<34}{base:>9.2f} us{total:>9.2f} us"
+        print(f"{row}{total - base:>9.2f} us")
+
+    if args.keyword in "import asta":
+        print(f"{'import asta':<34}{import_time(args.repeat):>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
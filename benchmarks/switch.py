@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Measure the per-call overhead of ``@typechecked`` when typechecking has been
+switched off at runtime, relative to calling the undecorated function, and to
+a bare wrapper which only forwards its arguments. The difference between the
+latter two is the cost of the switch itself.
+"""
+import timeit
+
+import numpy as np
+
+import asta
+from asta import Array, typechecked
+
+# pylint: disable=invalid-name
+
+NUMBER = 1_000_000
+REPEAT = 5
+
+
+def add(x: Array[float, 8, 64], y: Array[float, 8, 64]) -> Array[float, 8, 64]:
+    """ The function being called. """
+    return x
+
+
+def forward(*args, **kwargs):  # type: ignore[no-untyped-def]
+    """ A wrapper which does nothing but forward its arguments. """
+    return add(*args, **kwargs)
+
+
+def best_ns(func, *args) -> float:  # type: ignore[no-untyped-def]
+    """ The best time per call of ``func(*args)`` in nanoseconds. """
+    times = timeit.repeat(lambda: func(*args), number=NUMBER, repeat=REPEAT)
+    return min(times) / NUMBER * 1e9
+
+
+def main() -> None:
+    """ Time undecorated and disabled calls. """
+    x = np.zeros((8, 64))
+    checked = typechecked(add)
+    asta.disable()
+    base = best_ns(add, x, x)
+    forwarded = best_ns(forward, x, x)
+    disabled = best_ns(checked, x, x)
+    asta.enable()
+    print(f"undecorated: {base:8.1f} ns/call")
+    print(f"forwarded:   {forwarded:8.1f} ns/call")
+    print(f"disabled:    {disabled:8.1f} ns/call")
+    print(f"switch cost: {disabled - forwarded:8.1f} ns/call")
+
+
+if __name__ == "__main__":
+    main()